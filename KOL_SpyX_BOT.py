@@ -1,20 +1,18 @@
 import os
-import requests
-from requests.exceptions import RequestException
-from config import USER_DATA_FOLDER, API_TOKEN
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler
+import asyncio
+from config import USER_DATA_FOLDER, API_TOKEN, STATS_TOKEN, TELEGRAM_API_BASE_URL, TELEGRAM_READ_TIMEOUT
+from telegram.ext import Application, CommandHandler, CallbackQueryHandler, MessageHandler, filters
 from telegram.error import NetworkError, TimedOut
-from commands import start, delete_all_command, button, add, remove, list_tracked, help, update_command
+from commands import start, delete_all_command, button, add, remove, add_many, remove_many, batch_file_upload, list_tracked, help, update_command, stats_command, filter_command, search_command
 import database  
 import time
 import httpx
 import logging
 from logger import logger
 import random
-from flask import Flask, request
+from flask import Flask, jsonify, request
 from threading import Thread
 import signal
-import sys
 
 # Use the logger from logger.py
 logger = logging.getLogger('KOL_SpyX_Bot')
@@ -30,25 +28,80 @@ def dummy_endpoint():
 @app.route('/healthz')
 def health_check():
     return "OK", 200
-    
-def retry_request(func, retries=3, initial_delay=5, backoff_factor=2, max_delay=60):
-    """Retries a function with exponential backoff in case of NetworkError or TimedOut."""
-    attempt = 0
+
+def token_valid():
+    """Operator endpoints need ?token= matching STATS_TOKEN, and stay closed while it is unset."""
+    return bool(STATS_TOKEN) and request.args.get('token') == STATS_TOKEN
+
+@app.route('/stats')
+def stats_endpoint():
+    if not token_valid():
+        return "Forbidden", 403
+    return jsonify(database.get_stats())
+
+@app.route('/metrics')
+def metrics_endpoint():
+    if not token_valid():
+        return "Forbidden", 403
+    return jsonify(get_supervisor_metrics())
+
+# Reconnection settings for the polling supervisor
+RECONNECT_INITIAL_DELAY = 1  # Seconds before the first reconnection attempt
+RECONNECT_MAX_DELAY = 30  # Upper bound for the backoff between reconnection attempts
+HEALTH_CHECK_INTERVAL = 5  # Seconds between supervisor health checks
+
+# Connection metrics exposed on /metrics
+supervisor_metrics = {
+    "started_at": time.time(),
+    "reconnects": 0,
+    "network_errors": 0,
+    "downtime_seconds": 0.0,
+    "down_since": None,
+    "last_error": None,
+}
+
+def get_supervisor_metrics():
+    """Return a snapshot of the connection metrics, including any ongoing outage."""
+    snapshot = dict(supervisor_metrics)
+    if snapshot["down_since"] is not None:
+        snapshot["downtime_seconds"] += time.time() - snapshot["down_since"]
+    snapshot["connected"] = snapshot["down_since"] is None
+    return snapshot
+
+def mark_down(error):
+    """Record a network failure and open an outage window if one isn't open yet."""
+    supervisor_metrics["network_errors"] += 1
+    supervisor_metrics["last_error"] = str(error)
+    if supervisor_metrics["down_since"] is None:
+        supervisor_metrics["down_since"] = time.time()
+        logger.warning(f"Connection to Telegram lost: {error}")
+
+def mark_up():
+    """Close the current outage window, if any, and count it as a reconnection."""
+    down_since = supervisor_metrics["down_since"]
+    if down_since is not None:
+        downtime = time.time() - down_since
+        supervisor_metrics["downtime_seconds"] += downtime
+        supervisor_metrics["down_since"] = None
+        supervisor_metrics["reconnects"] += 1
+        logger.info(f"Reconnected to Telegram after {downtime:.1f} seconds.")
+
+def backoff_delays(initial_delay=RECONNECT_INITIAL_DELAY, max_delay=RECONNECT_MAX_DELAY):
+    """Yield exponentially growing delays with jitter to prevent synchronized retries."""
     delay = initial_delay
-    while attempt < retries:
-        try:
-            return func()  # Execute the passed function
-        except (NetworkError, TimedOut) as e:
-            attempt += 1
-            jitter = random.uniform(0, 1)  # Add some randomness to prevent synchronized retries
-            delay = min(delay * backoff_factor + jitter, max_delay)  # Ensure delay doesn't exceed max_delay
-            logger.error(f"Attempt {attempt} failed: {e}. Retrying in {delay:.2f} seconds...")
-            time.sleep(delay)
-        except Exception as e:
-            logger.error(f"Non-recoverable error occurred: {e}")
-            raise  # Re-raise the exception if it's not retryable
-    logger.error(f"Failed after {retries} attempts.")
-    return None
+    while True:
+        yield random.uniform(delay / 2, delay)
+        delay = min(delay * 2, max_delay)
+
+def polling_error_callback(error):
+    """
+    Called by the updater when fetching updates fails; it keeps retrying on its own. Timeouts are
+    retried internally and never reach this callback, so the supervisor's probe catches those.
+    """
+    if isinstance(error, (NetworkError, TimedOut)):
+        mark_down(error)
+    else:
+        logger.error(f"Error while polling for updates: {error}")
 
 # Ensure the user data folder exists
 if not os.path.exists(USER_DATA_FOLDER):
@@ -62,30 +115,86 @@ if not os.path.exists(common_data_folder):
 # Log some startup info
 logger.info("Starting KOL_SpyX_BOT...")
 
-def check_internet():
-    """Check internet connectivity by attempting to reach Google and Twitter."""
+def build_application():
+    """Create the Telegram application and register the command handlers."""
+    builder = Application.builder().token(API_TOKEN).base_url(TELEGRAM_API_BASE_URL)
+    if os.getenv('TELEGRAM_READ_TIMEOUT'):
+        builder = builder.read_timeout(TELEGRAM_READ_TIMEOUT)
+    application = builder.build()
+
+    # Add handlers for commands
+    application.add_handler(CommandHandler("start", start))
+    application.add_handler(CommandHandler("add", add))
+    application.add_handler(CommandHandler("remove", remove))
+    application.add_handler(CommandHandler("add_many", add_many))
+    application.add_handler(CommandHandler("remove_many", remove_many))
+    application.add_handler(MessageHandler(filters.Document.ALL & filters.CaptionRegex(r'^/(add|remove)_many\b'), batch_file_upload))
+    application.add_handler(CommandHandler("list", list_tracked))
+    application.add_handler(CommandHandler("filter", filter_command))
+    application.add_handler(CommandHandler("search", search_command))
+    application.add_handler(CommandHandler("delete_all", delete_all_command))
+    application.add_handler(CallbackQueryHandler(button))
+    application.add_handler(CommandHandler("help", help))
+    application.add_handler(CommandHandler("update", update_command))
+    application.add_handler(CommandHandler("stats", stats_command))
+
+    logger.info("Command handlers added successfully.")
+    return application
+
+def run_flask():
+    port = int(os.environ.get('PORT', 5000))
+    app.run(host='0.0.0.0', port=port)
+
+async def wait_or_stop(stop_event, delay):
+    """Sleep for `delay` seconds, returning True early if shutdown was requested."""
     try:
-        for url in ['https://www.icanhazip.com']:
-            response = requests.get(url, timeout=5)
-            if response.status_code == 200:
-                return True
-    except requests.RequestException as e:
-        logger.error(f"Internet connection issue: {e}")
+        await asyncio.wait_for(stop_event.wait(), timeout=delay)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+async def connect(application, stop_event):
+    """Reach the Bot API, retrying with jittered backoff. Returns False if shutdown was requested."""
+    for delay in backoff_delays():
+        try:
+            await application.initialize()  # No-op once the application is initialized
+            await application.bot.get_me()
+            mark_up()
+            return True
+        except (NetworkError, TimedOut, httpx.RequestError) as e:
+            mark_down(e)
+            logger.error(f"Could not reach Telegram: {e}. Retrying in {delay:.2f} seconds...")
+            if await wait_or_stop(stop_event, delay):
+                return False
     return False
 
-def stop_flask_server():
-    func = request.environ.get('werkzeug.server.shutdown')
-    if func is None:
-        raise RuntimeError('Not running with the Werkzeug Server')
-    func()
-
-def signal_handler(signum, frame):
-    logger.info("Received interrupt signal. Shutting down gracefully.")
-    if 'flask_thread' in globals() and flask_thread.is_alive():
-        stop_flask_server()
-    sys.exit(0)
-
-def main():
+async def supervise(application, stop_event):
+    """
+    Keep a single application polling. The updater retries failed polls itself and swallows
+    timeouts without reporting them, so the supervisor probes the API on every health check to
+    open and close outage windows, and restarts polling if it ever stops.
+    """
+    if not await connect(application, stop_event):
+        return
+    await application.start()
+    await application.updater.start_polling(error_callback=polling_error_callback)
+    logger.info("Bot started running")
+
+    while not await wait_or_stop(stop_event, HEALTH_CHECK_INTERVAL):
+        if not application.updater.running:
+            logger.warning("Polling stopped unexpectedly. Restarting...")
+            mark_down("polling stopped")
+            if not await connect(application, stop_event):
+                break
+            await application.updater.start_polling(error_callback=polling_error_callback)
+        else:
+            try:
+                await application.bot.get_me()
+                mark_up()
+            except (NetworkError, TimedOut, httpx.RequestError) as e:
+                mark_down(e)
+
+async def main():
     try:
         # Ensure tables are created
         database.create_tables()
@@ -93,64 +202,30 @@ def main():
     except Exception as e:
         logger.error(f"Error during table creation: {e}")
 
-    while True:  # Keep the bot running indefinitely
-        try:
-            application = Application.builder().token(API_TOKEN).build()
-            logger.info("Telegram bot application initialized successfully.")
-
-            # Add handlers for commands
-            application.add_handler(CommandHandler("start", start))
-            application.add_handler(CommandHandler("add", add))
-            application.add_handler(CommandHandler("remove", remove))
-            application.add_handler(CommandHandler("list", list_tracked))
-            application.add_handler(CommandHandler("delete_all", delete_all_command))
-            application.add_handler(CallbackQueryHandler(button))
-            application.add_handler(CommandHandler("help", help))
-            application.add_handler(CommandHandler("update", update_command))
-
-            logger.info("Command handlers added successfully.")
-
-            # Check internet connection and start the bot, retry if no internet
-            if not retry_request(check_internet):
-                logger.error("Failed to connect to internet after multiple attempts. Restarting in 10 seconds...")
-                time.sleep(10)
-                continue  # Restart the loop to check internet again
-
-            # Run both Flask server and Telegram bot in separate threads
-            def run_flask():
-                port = int(os.environ.get('PORT', 5000))
-                app.run(host='0.0.0.0', port=port)
-
-            global flask_thread
-            flask_thread = Thread(target=run_flask)
-            flask_thread.start()
-
-            # Run the bot with retry logic for network issues
-            logger.info("Bot started running")
-            retry_request(lambda: application.run_polling(), retries=5, initial_delay=10, backoff_factor=2, max_delay=60)
-            # If we've made it here, we'll sleep for a bit before the next check to prevent tight loops
-            time.sleep(60)  # Sleep for a minute before next cycle
-
-        except NetworkError as ne:
-            logger.error(f"NetworkError occurred: {ne}")
-        except httpx.RequestError as e:
-            logger.error(f"HTTP request failed: {e}")
-        except TimedOut as te:
-            logger.error(f"TimedOut error occurred: {te}")
-        except RequestException as re:
-            logger.error(f"RequestException occurred: {re}")
-        except Exception as e:
-            logger.error(f"Unexpected error during bot execution: {e}")
-            logger.error("Bot stopped unexpectedly. Restarting in 60 seconds...")
-            time.sleep(60)  # Wait before retrying
-        except KeyboardInterrupt:
-            logger.info("Bot execution interrupted by user. Exiting gracefully.")
-            break  # Exit the while loop
-
-    # Add any cleanup code here if needed
+    application = build_application()
+    logger.info("Telegram bot application initialized successfully.")
+
+    # Run the Flask server alongside the bot; as a daemon it exits with the process
+    Thread(target=run_flask, daemon=True).start()
+
+    # Stop gracefully on interrupt or termination
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop_event.set)
+
+    try:
+        await supervise(application, stop_event)
+    except Exception as e:
+        logger.error(f"Unexpected error during bot execution: {e}")
+        raise
+    finally:
+        logger.info("Shutting down gracefully.")
+        if application.updater.running:
+            await application.updater.stop()
+        if application.running:
+            await application.stop()
+        await application.shutdown()
 
 if __name__ == '__main__':
-    # Register the signal handler for graceful shutdown
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
-    main()
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+import re
+from datetime import datetime, timezone
+import pandas as pd
+
+# Format of the `created_at` column as exported from Twitter
+TWITTER_DATE_FORMAT = "%a %b %d %H:%M:%S %z %Y"
+
+# Spellings of a true `blue_verified` value found in imported CSVs
+TRUE_VALUES = ("1", "true", "yes")
+
+def parse_keywords(text):
+    """Split a comma separated keyword list, dropping blanks."""
+    return [k.strip() for k in (text or "").split(",") if k.strip()]
+
+def compile_alert_filter(rules):
+    """
+    Compile a chat's stored rules into a predicate that takes a DataFrame of followers (the
+    `followers` table columns) and returns a boolean mask of rows worth alerting on. Returns None
+    when the chat has no active rules, so callers can skip filtering entirely.
+    """
+    if not rules:
+        return None
+    checks = []
+
+    if rules.get("verified_only"):
+        checks.append(lambda df: df["blue_verified"].astype(str).str.strip().str.lower().isin(TRUE_VALUES))
+
+    min_followers = rules.get("min_followers")
+    if min_followers:
+        checks.append(lambda df: pd.to_numeric(df["followers_count"], errors="coerce").fillna(0) >= min_followers)
+
+    max_age_days = rules.get("max_account_age_days")
+    if max_age_days:
+        def check_age(df):
+            created_at = pd.to_datetime(df["created_at"], format=TWITTER_DATE_FORMAT, errors="coerce", utc=True)
+            age_days = (pd.Timestamp(datetime.now(timezone.utc)) - created_at).dt.days
+            return age_days.le(max_age_days).fillna(False).astype(bool)
+        checks.append(check_age)
+
+    keywords = parse_keywords(rules.get("keywords"))
+    if keywords:
+        pattern = "|".join(re.escape(k) for k in keywords)
+        checks.append(lambda df: df["bio"].fillna("").astype(str).str.contains(pattern, case=False, regex=True))
+
+    if not checks:
+        return None
+
+    def predicate(df):
+        mask = pd.Series(True, index=df.index)
+        for check in checks:
+            mask &= check(df)
+        return mask
+
+    return predicate
+
+def describe_alert_filter(rules):
+    """Human readable summary of a chat's rules, one per line."""
+    if not rules:
+        return []
+    lines = []
+    if rules.get("verified_only"):
+        lines.append("✅ Verified accounts only")
+    if rules.get("min_followers"):
+        lines.append(f"👥 At least {rules['min_followers']} followers")
+    if rules.get("max_account_age_days"):
+        lines.append(f"📅 Accounts created in the last {rules['max_account_age_days']} days")
+    keywords = parse_keywords(rules.get("keywords"))
+    if keywords:
+        lines.append(f"🗒 Bio mentions any of: {', '.join(keywords)}")
+    return lines
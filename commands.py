@@ -7,14 +7,50 @@ import database
 import asyncio
 import shutil
 import sqlite3
-from config import bot, USER_DATA_FOLDER
+from config import bot, USER_DATA_FOLDER, ADMIN_CHAT_IDS
+from follower_db import create_db_and_table, ensure_dir, forget_dir, follower_dbs
+from alert_filters import describe_alert_filter, parse_keywords
 import logging
 from logger import logger
 
 # Use the logger from logger.py
 logger = logging.getLogger('KOL_SpyX_Bot')
 
+# Maximum number of usernames accepted by a single batch command or uploaded list
+MAX_BATCH_SIZE = 500
+
+# Telegram rejects messages longer than this many characters
+MAX_MESSAGE_LENGTH = 4096
+
+# Largest list file accepted for upload; 500 usernames fit comfortably in far less
+MAX_BATCH_FILE_SIZE = 64 * 1024
+
 # Utility functions
+def is_valid_username(username):
+    return len(username) >= 3 and re.match(r'^[A-Za-z0-9_]+$', username) is not None
+
+def parse_usernames(tokens, limit=None):
+    """
+    Split batch input into unique usernames, keeping the order they were given in. Parsing stops
+    once `limit` usernames have been collected, so oversized input costs no more than that.
+    """
+    usernames = {}
+    for token in tokens:
+        for match in re.finditer(r'[^\s,;]+', token):
+            username = match.group().lstrip('@')
+            if username:
+                usernames.setdefault(username, None)
+                if limit is not None and len(usernames) >= limit:
+                    return list(usernames)
+    return list(usernames)
+
+def format_usernames(usernames, limit=50):
+    """Render usernames as a compact list, truncated so the reply stays within Telegram's limits."""
+    shown = ", ".join(f"@{u}" for u in usernames[:limit])
+    if len(usernames) > limit:
+        shown += f" and {len(usernames) - limit} more"
+    return shown
+
 def get_user_folder(chat_id):
     return os.path.join(USER_DATA_FOLDER, str(chat_id))
 
@@ -22,30 +58,9 @@ def get_common_follower_db(tracked_account):
     return os.path.join(USER_DATA_FOLDER, "common_data", f"{tracked_account}.db")
 
 def get_user_follower_db(chat_id, tracked_account):
-    user_db_dir = get_user_folder(chat_id)
-    if not os.path.exists(user_db_dir):
-        os.makedirs(user_db_dir)
+    user_db_dir = ensure_dir(get_user_folder(chat_id))
     return os.path.join(user_db_dir, f"{tracked_account}.db")
 
-def create_db_and_table(db_path):
-    with sqlite3.connect(db_path) as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS followers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT,
-            name TEXT,
-            username TEXT,
-            bio TEXT,
-            profile_url TEXT,
-            followers_count INTEGER,
-            created_at TEXT,
-            blue_verified BOOLEAN,
-            location TEXT
-        );
-        ''')
-        conn.commit()
-
 def sync_db_from_common_to_user(common_db_path, user_db_path):
     with sqlite3.connect(common_db_path) as common_conn, sqlite3.connect(user_db_path) as user_conn:
         common_cursor = common_conn.cursor()
@@ -59,13 +74,31 @@ def sync_db_from_common_to_user(common_db_path, user_db_path):
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''', row)
     user_conn.commit()
 
+def setup_user_follower_dbs(chat_id, usernames):
+    """Create the follower DBs for newly tracked accounts, seeding each from its common DB when one exists."""
+    user_folder = ensure_dir(get_user_folder(chat_id))
+    for username in usernames:
+        user_db = os.path.join(user_folder, f"{username}.db")
+        if os.path.exists(user_db):
+            continue
+        common_db = get_common_follower_db(username)
+        if os.path.exists(common_db):
+            # The backup API copies schema and rows in one pass
+            with sqlite3.connect(common_db) as common_conn, sqlite3.connect(user_db) as user_conn:
+                common_conn.backup(user_conn)
+        else:
+            create_db_and_table(user_db)
+
 # Delete user's folder and database entries
 async def delete_all_data(chat_id: int):
     user_folder = get_user_folder(chat_id)
     
     try:
+        # Close cached handles before their files go away
+        follower_dbs.evict_dir(user_folder)
         if os.path.exists(user_folder):
             shutil.rmtree(user_folder)
+        forget_dir(user_folder)
         database.delete_user_data(chat_id)
         logger.info(f"All data for user {chat_id} deleted.")
     except Exception as e:
@@ -142,7 +175,7 @@ async def add(update: Update, context: CallbackContext) -> None:
         return
 
     username = context.args[0].lstrip('@')
-    if len(username) < 3 or not re.match(r'^[A-Za-z0-9_]+$', username):
+    if not is_valid_username(username):
         await update.message.reply_text(f"🚫 Invalid account: @{username}. Usernames should be at least 3 characters long and contain only letters, numbers, or underscores.")
         return
 
@@ -169,7 +202,7 @@ async def remove(update: Update, context: CallbackContext) -> None:
         return
 
     username = context.args[0].lstrip('@')
-    if len(username) < 3 or not re.match(r'^[A-Za-z0-9_]+$', username):
+    if not is_valid_username(username):
         await update.message.reply_text(f"🚫 Invalid account: @{username}. Usernames should be at least 3 characters long and contain only letters, numbers, or underscores.")
         return
 
@@ -180,6 +213,7 @@ async def remove(update: Update, context: CallbackContext) -> None:
     database.remove_account(username, chat_id)
     tracked_account_db = get_user_follower_db(chat_id, username)
     try:
+        follower_dbs.evict(tracked_account_db)
         if os.path.exists(tracked_account_db):
             os.remove(tracked_account_db)
         await update.message.reply_text(f"❌ Stopped tracking: <a href='https://twitter.com/{username}'>@{username}</a>", parse_mode='HTML')
@@ -187,6 +221,76 @@ async def remove(update: Update, context: CallbackContext) -> None:
         logger.error(f"Error removing account {username} for user {chat_id}: {e}")
         await update.message.reply_text(f"❌ Error occurred while stopping tracking for @{username}.", parse_mode='HTML')
 
+# Batch add/remove shared by the commands and uploaded list files
+async def apply_batch(update: Update, action: str, tokens) -> None:
+    chat_id = update.message.chat_id
+    usernames = parse_usernames(tokens, limit=MAX_BATCH_SIZE + 1)
+    if not usernames:
+        await update.message.reply_text(f"❗Please provide usernames to {action}. Usage: /{action}_many @user1 @user2 ... or upload a list file with the caption /{action}_many")
+        return
+    if len(usernames) > MAX_BATCH_SIZE:
+        await update.message.reply_text(f"🚫 Too many accounts. You can {action} up to {MAX_BATCH_SIZE} at once.")
+        return
+
+    invalid = [u for u in usernames if not is_valid_username(u)]
+    valid = [u for u in usernames if is_valid_username(u)]
+    lines = []
+
+    if action == "add":
+        added = database.add_accounts_bulk(valid, chat_id)
+        setup_user_follower_dbs(chat_id, added)
+        added_set = set(added)
+        skipped = [u for u in valid if u not in added_set]
+        if added:
+            lines.append(f"✅ Now tracking {len(added)}: {format_usernames(added)}")
+        if skipped:
+            lines.append(f"⚠️ Already tracking {len(skipped)}: {format_usernames(skipped)}")
+    else:
+        removed = database.remove_accounts_bulk(valid, chat_id)
+        for username in removed:
+            try:
+                tracked_account_db = get_user_follower_db(chat_id, username)
+                follower_dbs.evict(tracked_account_db)
+                if os.path.exists(tracked_account_db):
+                    os.remove(tracked_account_db)
+            except Exception as e:
+                logger.error(f"Error removing account {username} for user {chat_id}: {e}")
+        removed_set = set(removed)
+        skipped = [u for u in valid if u not in removed_set]
+        if removed:
+            lines.append(f"❌ Stopped tracking {len(removed)}: {format_usernames(removed)}")
+        if skipped:
+            lines.append(f"⚠️ Not tracking {len(skipped)}: {format_usernames(skipped)}")
+
+    if invalid:
+        lines.append(f"🚫 Invalid {len(invalid)}: {format_usernames(invalid)}")
+    await update.message.reply_text("\n\n".join(lines))
+
+# Add many command
+async def add_many(update: Update, context: CallbackContext) -> None:
+    await apply_batch(update, "add", context.args)
+
+# Remove many command
+async def remove_many(update: Update, context: CallbackContext) -> None:
+    await apply_batch(update, "remove", context.args)
+
+# Uploaded list file with /add_many or /remove_many as its caption
+async def batch_file_upload(update: Update, context: CallbackContext) -> None:
+    action = "add" if update.message.caption.startswith("/add_many") else "remove"
+    file_size = update.message.document.file_size
+    if file_size and file_size > MAX_BATCH_FILE_SIZE:
+        await update.message.reply_text(f"🚫 The list file is too large. Please upload at most {MAX_BATCH_FILE_SIZE // 1024} KB "
+                                        f"({MAX_BATCH_SIZE} usernames) at a time.")
+        return
+    try:
+        file = await update.message.document.get_file()
+        content = (await file.download_as_bytearray()).decode('utf-8', errors='ignore')
+    except Exception as e:
+        logger.error(f"Error downloading list file for user {update.message.chat_id}: {e}")
+        await update.message.reply_text("⚠️ Could not read the uploaded file. Please send a plain text or CSV list of usernames.")
+        return
+    await apply_batch(update, action, [content])
+
 # List command
 async def list_tracked(update: Update, context: CallbackContext) -> None:
     chat_id = update.message.chat_id
@@ -198,6 +302,126 @@ async def list_tracked(update: Update, context: CallbackContext) -> None:
     else:
         await update.message.reply_text("🛑 You are not tracking any accounts yet.")
 
+def format_stats(stats):
+    totals = stats["totals"]
+    lines = [
+        "📊 SpyX stats",
+        f"Subscriptions: {totals.get('subscribers', 0)}",
+        f"Tracked accounts: {totals.get('tracked_accounts', 0)}",
+        f"Followers stored: {totals.get('followers_stored', 0)}",
+        f"Alerts sent: {totals.get('alerts_sent', 0)}",
+    ]
+    if stats["top_accounts"]:
+        lines.append("\n🔥 Most tracked:")
+        lines.extend(f"@{a['username']} - {a['subscribers']} subscribers, {a['followers_stored']} followers stored, "
+                     f"{a['alerts_sent']} alerts" for a in stats["top_accounts"])
+    if stats["daily_alerts"]:
+        lines.append("\n📅 Alerts per day:")
+        lines.extend(f"{d['day']}: {d['alerts_sent']}" for d in stats["daily_alerts"])
+    return "\n".join(lines)
+
+# Stats command (admins only)
+async def stats_command(update: Update, context: CallbackContext) -> None:
+    chat_id = update.message.chat_id
+    if str(chat_id) not in ADMIN_CHAT_IDS:
+        await update.message.reply_text("🚫 This command is restricted to operators.")
+        return
+
+    if context.args:
+        username = context.args[0].lstrip('@')
+        account = database.get_account_stats(username)
+        if not account:
+            await update.message.reply_text(f"No stats recorded for @{username}.")
+            return
+        await update.message.reply_text(
+            f"📊 @{username}\nSubscribers: {account['subscribers']}\n"
+            f"Followers stored: {account['followers_stored']}\nAlerts sent: {account['alerts_sent']}")
+        return
+
+    await update.message.reply_text(format_stats(database.get_stats()))
+
+FILTER_USAGE = """Usage:
+/filter verified on|off - Only alert on verified accounts
+/filter min_followers <count> - Only alert on accounts with at least this many followers (0 to disable)
+/filter max_age <days> - Only alert on accounts created within this many days (0 to disable)
+/filter keywords token, airdrop - Only alert when the bio mentions one of these (off to disable)
+/filter clear - Remove all filters"""
+
+# Filter command
+async def filter_command(update: Update, context: CallbackContext) -> None:
+    chat_id = update.message.chat_id
+    args = context.args
+
+    if not args:
+        rules = describe_alert_filter(database.get_alert_filter(chat_id))
+        current = "🔍 Active alert filters:\n" + "\n".join(rules) if rules else "🔍 No alert filters set. You get an alert for every new follow."
+        await update.message.reply_text(f"{current}\n\n{FILTER_USAGE}")
+        return
+
+    rule, values = args[0].lower(), args[1:]
+    try:
+        if rule == "clear":
+            database.clear_alert_filter(chat_id)
+            await update.message.reply_text("🧹 All alert filters removed.")
+            return
+        if rule == "verified" and len(values) == 1 and values[0].lower() in ("on", "off"):
+            database.set_alert_filter_rule(chat_id, "verified_only", int(values[0].lower() == "on"))
+        elif rule in ("min_followers", "max_age") and len(values) == 1 and values[0].isdigit():
+            column = "min_followers" if rule == "min_followers" else "max_account_age_days"
+            database.set_alert_filter_rule(chat_id, column, int(values[0]) or None)
+        elif rule == "keywords" and values:
+            keywords = parse_keywords(" ".join(values))
+            off = len(keywords) == 1 and keywords[0].lower() == "off"
+            database.set_alert_filter_rule(chat_id, "keywords", None if off else ", ".join(keywords))
+        else:
+            await update.message.reply_text(f"❗Unrecognised filter.\n\n{FILTER_USAGE}")
+            return
+    except Exception as e:
+        logger.error(f"Error updating alert filter for user {chat_id}: {e}")
+        await update.message.reply_text("⚠️ An error occurred while updating your filters.")
+        return
+
+    rules = describe_alert_filter(database.get_alert_filter(chat_id))
+    await update.message.reply_text("✅ Filters updated.\n" + ("\n".join(rules) if rules else "No filters active."))
+
+# Search command
+async def search_command(update: Update, context: CallbackContext) -> None:
+    chat_id = update.message.chat_id
+    terms = [t for t in context.args if t.strip()]
+    if not terms:
+        await update.message.reply_text("❗Please provide something to search for. Usage: /search airdrop")
+        return
+    if not database.SEARCH_AVAILABLE:
+        await update.message.reply_text("⚠️ Search is not available right now.")
+        return
+
+    try:
+        results = database.search_followers(chat_id, terms)
+    except Exception as e:
+        logger.error(f"Error searching followers for user {chat_id}: {e}")
+        await update.message.reply_text("⚠️ An error occurred while searching.")
+        return
+
+    if not results:
+        await update.message.reply_text(f"🔎 None of your tracked accounts follow anyone matching \"{' '.join(terms)}\".")
+        return
+
+    query = ' '.join(terms)
+    if len(query) > 100:
+        query = query[:100] + "…"
+    reply = f"🔎 Matches for \"{query}\":"
+    for shown, r in enumerate(results):
+        bio = (r['bio'] or "").replace("\n", " ")
+        if len(bio) > 100:
+            bio = bio[:100] + "…"
+        entry = f"\n\n@{r['username']} ({r['name']}) ← followed by @{r['tracked_account']}\n{bio}"
+        # Leave room for the "more" note so the reply stays within Telegram's limit
+        if len(reply) + len(entry) > MAX_MESSAGE_LENGTH - 50:
+            reply += f"\n\n…and {len(results) - shown} more. Narrow your search to see them."
+            break
+        reply += entry
+    await update.message.reply_text(reply, disable_web_page_preview=True)
+
 # Help command
 async def help(update: Update, context: CallbackContext) -> None:
     help_message = """
@@ -205,6 +429,10 @@ async def help(update: Update, context: CallbackContext) -> None:
 /start - Begin your covert operation with a briefing.
 /add <username> - Initiate surveillance on a Twitter account. (I'll keep watch, even if I'm in the shadows!)
 /remove <username> - Discontinue surveillance on an account. (I'll erase their trace before my next mission!)
+/add_many <username> <username> ... - Put a whole squad under surveillance at once. (Or send me a list file captioned /add_many!)
+/remove_many <username> <username> ... - Call off surveillance on several accounts. (A list file captioned /remove_many works too!)
+/filter - Choose which new follows deserve an alert. (Verified only, follower count, account age, bio keywords!)
+/search <terms> - Search the profiles your targets follow. (Names, bios, locations - I keep the files!)
 /list - Review the list of monitored targets. (I'll share the intel once I decrypt the data!)
 /update - Manually update tracking data. (Might require recalibration of my gadgets!)
 /delete_all - Erase all mission data. (Confirm to burn after reading!)
@@ -216,7 +444,7 @@ Note: If you engage me after a period of radio silence, there might be a delay w
 
 def run_update_followers():
     script_path = os.path.join(os.path.dirname(__file__), "update_script.py")
-    subprocess.run(['python', script_path])
+    subprocess.run(['python', script_path, '--all'])  # Manual updates refresh every account
 
 async def update_command(update: Update, context: CallbackContext) -> None:
     chat_id = update.message.chat_id
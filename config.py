@@ -11,23 +11,34 @@ API_TOKEN = os.getenv('API_TOKEN')
 if not API_TOKEN:
     raise ValueError("API Token is missing! Please set it in the .env file.")
 
+# Bot API endpoint and read timeout; overridable so the bot can run against a local fake API (see load_test.py)
+TELEGRAM_API_BASE_URL = os.getenv('TELEGRAM_API_BASE_URL', 'https://api.telegram.org/bot')
+TELEGRAM_READ_TIMEOUT = float(os.getenv('TELEGRAM_READ_TIMEOUT', 120))
+
 # Configure Bot with custom request handler for better performance
 bot = Bot(token=API_TOKEN, 
+          base_url=TELEGRAM_API_BASE_URL,
           request=HTTPXRequest(
               connection_pool_size=100, 
               pool_timeout=120, 
-              read_timeout=120,  # Add read timeout for long operations
+              read_timeout=TELEGRAM_READ_TIMEOUT,  # Add read timeout for long operations
               write_timeout=120  # Add write timeout for long uploads
           ))
 
 # Set up user data folder path
-USER_DATA_FOLDER = os.path.join(os.path.dirname(__file__), "userdata")
+USER_DATA_FOLDER = os.getenv('USER_DATA_FOLDER', os.path.join(os.path.dirname(__file__), "userdata"))
 
 # Ensure the user data folder exists
 if not os.path.exists(USER_DATA_FOLDER):
     os.makedirs(USER_DATA_FOLDER)
     print(f"Created user data folder at {USER_DATA_FOLDER}")
 
+# Chat IDs allowed to use admin commands such as /stats (comma-separated)
+ADMIN_CHAT_IDS = {chat_id.strip() for chat_id in os.getenv('ADMIN_CHAT_IDS', '').split(',') if chat_id.strip()}
+
+# Token required by the HTTP /stats and /metrics endpoints; both are disabled when unset
+STATS_TOKEN = os.getenv('STATS_TOKEN')
+
 # More configuration variables could be added here if needed
 # Example:
 # TIMEZONE = os.getenv('TIMEZONE', 'UTC')  # Default to UTC if TIMEZONE is not set
@@ -1,5 +1,6 @@
 import sqlite3
 import logging
+import time
 from logger import logger
 from sqlite3 import Error
 from typing import List, Dict
@@ -9,11 +10,19 @@ DATABASE_FILE = 'kol_spyx_bot.db'
 # Use the logger from logger.py
 logger = logging.getLogger('KOL_SpyX_Bot')
 
+# Whether the FTS5 follower index could be created; set by create_tables
+SEARCH_AVAILABLE = False
+
+# Callables run on every new connection, e.g. to trace statements while profiling
+connection_hooks = []
+
 def create_connection():
     """Create and return a connection to the database."""
     try:
         conn = sqlite3.connect(DATABASE_FILE, timeout=10.0)  # Added timeout for better handling of concurrent access
         conn.row_factory = sqlite3.Row  # Access columns by name
+        for hook in connection_hooks:
+            hook(conn)
         return conn
     except sqlite3.Error as e:
         logger.error(f"Error creating database connection: {e}")
@@ -33,36 +42,186 @@ def create_tables():
                                 PRIMARY KEY (username, chat_id))''')
 
 
+            # Per-chat rules deciding which new follows are worth an alert
+            cursor.execute('''CREATE TABLE IF NOT EXISTS alert_filters (
+                                chat_id TEXT PRIMARY KEY,
+                                verified_only INTEGER NOT NULL DEFAULT 0,
+                                min_followers INTEGER,
+                                max_account_age_days INTEGER,
+                                keywords TEXT)''')
+
+            # Durable outbox of follower alerts, written in the same transaction that marks a follower as seen
+            cursor.execute('''CREATE TABLE IF NOT EXISTS notification_outbox (
+                                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                idempotency_key TEXT UNIQUE NOT NULL,
+                                chat_id TEXT NOT NULL,
+                                tracked_account TEXT NOT NULL,
+                                payload TEXT NOT NULL,
+                                status TEXT NOT NULL DEFAULT 'pending',
+                                attempts INTEGER NOT NULL DEFAULT 0,
+                                next_attempt_at REAL NOT NULL DEFAULT 0,
+                                last_error TEXT,
+                                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                                sent_at TIMESTAMP)''')
+
+            # Aggregate counters for /stats, kept up to date as subscriptions, followers and alerts change
+            cursor.execute('''CREATE TABLE IF NOT EXISTS account_stats (
+                                username TEXT PRIMARY KEY,
+                                subscribers INTEGER NOT NULL DEFAULT 0,
+                                followers_stored INTEGER NOT NULL DEFAULT 0,
+                                alerts_sent INTEGER NOT NULL DEFAULT 0)''')
+            cursor.execute('''CREATE TABLE IF NOT EXISTS stats_totals (
+                                name TEXT PRIMARY KEY,
+                                value INTEGER NOT NULL DEFAULT 0)''')
+            cursor.execute('''CREATE TABLE IF NOT EXISTS daily_alerts (
+                                day TEXT PRIMARY KEY,
+                                alerts_sent INTEGER NOT NULL DEFAULT 0)''')
+
+            # Per-account refresh cadence learned by scheduler.py
+            cursor.execute('''CREATE TABLE IF NOT EXISTS refresh_schedule (
+                                username TEXT PRIMARY KEY,
+                                change_rate REAL NOT NULL DEFAULT 1.0,
+                                last_checked_at REAL,
+                                next_due_at REAL NOT NULL DEFAULT 0)''')
+
             # Indexing to improve query performance
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_tracked_accounts_chat_id ON tracked_accounts(chat_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_account_stats_subscribers ON account_stats(subscribers)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_notification_outbox_due ON notification_outbox(status, next_attempt_at)")
+
+            # Seed subscriber counters from existing subscriptions the first time the stats tables appear
+            cursor.execute("SELECT 1 FROM stats_totals LIMIT 1")
+            if cursor.fetchone() is None:
+                seed_subscriber_stats(cursor)
+
+            create_search_index(cursor)
 
         logger.info("Database tables created or verified.")
     except Error as e:
         logger.error(f"Error creating tables: {e}")
         raise
 
+def create_search_index(cursor) -> None:
+    """
+    Create the full-text index over stored follower profiles, if this SQLite build has FTS5.
+    `tracked_account` is indexed so searches can be scoped inside the MATCH, and the prefix
+    index keeps short prefix terms from scanning the whole term list.
+    """
+    global SEARCH_AVAILABLE
+    try:
+        cursor.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS follower_search USING fts5(
+                            tracked_account, name, username, bio, location,
+                            tokenize='unicode61 remove_diacritics 2', prefix='2 3')''')
+        SEARCH_AVAILABLE = True
+    except Error as e:
+        SEARCH_AVAILABLE = False
+        logger.warning(f"Full-text search unavailable, SQLite lacks FTS5: {e}")
+
+def _bump_account_stat(cursor, username: str, column: str, delta: int, schema: str = "main") -> None:
+    """
+    Adjust a per-account counter and the matching total within the caller's transaction. `schema`
+    names the main DB on the cursor's connection, e.g. `spyx` on a follower DB that attached it.
+    """
+    if not delta:
+        return
+    cursor.execute(f'''INSERT INTO {schema}.account_stats (username, {column}) VALUES (?, ?)
+                      ON CONFLICT(username) DO UPDATE SET {column} = {column} + excluded.{column}''',
+                   (username, delta))
+    _bump_total(cursor, column, delta, schema)
+    if column == "subscribers":
+        # Keep the number of accounts with at least one subscriber in step
+        cursor.execute(f"SELECT subscribers FROM {schema}.account_stats WHERE username=?", (username,))
+        subscribers = cursor.fetchone()[0]
+        if delta > 0 and subscribers == delta:
+            _bump_total(cursor, "tracked_accounts", 1, schema)
+        elif delta < 0 and subscribers == 0:
+            _bump_total(cursor, "tracked_accounts", -1, schema)
+
+def _bump_total(cursor, name: str, delta: int, schema: str = "main") -> None:
+    cursor.execute(f'''INSERT INTO {schema}.stats_totals (name, value) VALUES (?, ?)
+                      ON CONFLICT(name) DO UPDATE SET value = value + excluded.value''', (name, delta))
+
+def seed_subscriber_stats(cursor) -> None:
+    """Rebuild subscriber counters from tracked_accounts."""
+    cursor.execute("UPDATE account_stats SET subscribers = 0")
+    cursor.execute('''INSERT INTO account_stats (username, subscribers)
+                      SELECT username, COUNT(*) FROM tracked_accounts WHERE true GROUP BY username
+                      ON CONFLICT(username) DO UPDATE SET subscribers = excluded.subscribers''')
+    cursor.execute('''INSERT OR REPLACE INTO stats_totals (name, value)
+                      SELECT 'subscribers', COUNT(*) FROM tracked_accounts''')
+    cursor.execute('''INSERT OR REPLACE INTO stats_totals (name, value)
+                      SELECT 'tracked_accounts', COUNT(*) FROM account_stats WHERE subscribers > 0''')
+
 def add_account(username: str, chat_id: str) -> None:
     """Add a tracked account and associate it with a chat ID."""
     try:
         with create_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("INSERT OR IGNORE INTO tracked_accounts (username, chat_id) VALUES (?, ?)", (username, chat_id))
+            _bump_account_stat(cursor, username, "subscribers", cursor.rowcount)
         logger.info(f"Account '{username}' added for chat_id {chat_id}.")
     except Error as e:
         logger.error(f"Error adding account '{username}' for chat_id {chat_id}: {e}")
         raise
 
+def _cancel_pending_notifications(cursor, chat_id: str, usernames: List[str] = None) -> None:
+    """Drop undelivered alerts for a chat, optionally only those about the given tracked accounts."""
+    if usernames is None:
+        cursor.execute("DELETE FROM notification_outbox WHERE chat_id=? AND status=?", (chat_id, "pending"))
+    else:
+        cursor.executemany("DELETE FROM notification_outbox WHERE chat_id=? AND tracked_account=? AND status=?",
+                           [(chat_id, username, "pending") for username in usernames])
+
 def remove_account(username: str, chat_id: str) -> None:
     """Remove a tracked account for a specific user."""
     try:
         with create_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("DELETE FROM tracked_accounts WHERE username=? AND chat_id=?", (username, chat_id))
+            _bump_account_stat(cursor, username, "subscribers", -cursor.rowcount)
+            _cancel_pending_notifications(cursor, chat_id, [username])
         logger.info(f"Account '{username}' removed for chat_id {chat_id}.")
     except Error as e:
         logger.error(f"Error removing account '{username}' for chat_id {chat_id}: {e}")
         raise
 
+def add_accounts_bulk(usernames: List[str], chat_id: str) -> List[str]:
+    """Add many tracked accounts for a chat in one transaction. Returns the usernames that were newly added."""
+    try:
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT username FROM tracked_accounts WHERE chat_id=?", (chat_id,))
+            existing = {row["username"] for row in cursor.fetchall()}
+            added = [username for username in usernames if username not in existing]
+            cursor.executemany("INSERT OR IGNORE INTO tracked_accounts (username, chat_id) VALUES (?, ?)",
+                               [(username, chat_id) for username in added])
+            for username in added:
+                _bump_account_stat(cursor, username, "subscribers", 1)
+        logger.info(f"{len(added)} accounts added for chat_id {chat_id}.")
+        return added
+    except Error as e:
+        logger.error(f"Error adding accounts in bulk for chat_id {chat_id}: {e}")
+        raise
+
+def remove_accounts_bulk(usernames: List[str], chat_id: str) -> List[str]:
+    """Remove many tracked accounts for a chat in one transaction. Returns the usernames that were removed."""
+    try:
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT username FROM tracked_accounts WHERE chat_id=?", (chat_id,))
+            existing = {row["username"] for row in cursor.fetchall()}
+            removed = [username for username in usernames if username in existing]
+            cursor.executemany("DELETE FROM tracked_accounts WHERE username=? AND chat_id=?",
+                               [(username, chat_id) for username in removed])
+            for username in removed:
+                _bump_account_stat(cursor, username, "subscribers", -1)
+            _cancel_pending_notifications(cursor, chat_id, removed)
+        logger.info(f"{len(removed)} accounts removed for chat_id {chat_id}.")
+        return removed
+    except Error as e:
+        logger.error(f"Error removing accounts in bulk for chat_id {chat_id}: {e}")
+        raise
+
 def get_tracked_accounts(chat_id: str) -> List[str]:
     """Retrieve all tracked accounts for a specific user."""
     try:
@@ -90,12 +249,67 @@ def delete_user_data(chat_id: str) -> None:
     try:
         with create_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute("SELECT username FROM tracked_accounts WHERE chat_id=?", (chat_id,))
+            for row in cursor.fetchall():
+                _bump_account_stat(cursor, row["username"], "subscribers", -1)
             cursor.execute("DELETE FROM tracked_accounts WHERE chat_id=?", (chat_id,))
+            cursor.execute("DELETE FROM alert_filters WHERE chat_id=?", (chat_id,))
+            _cancel_pending_notifications(cursor, chat_id)
         logger.info(f"All data for chat_id {chat_id} deleted.")
     except Error as e:
         logger.error(f"Error deleting user data for chat_id {chat_id}: {e}")
         raise
 
+ALERT_FILTER_RULES = ("verified_only", "min_followers", "max_account_age_days", "keywords")
+
+def set_alert_filter_rule(chat_id: str, rule: str, value) -> None:
+    """Set one alert filter rule for a chat; None switches the rule off."""
+    if rule not in ALERT_FILTER_RULES:
+        raise ValueError(f"Unknown alert filter rule '{rule}'")
+    try:
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("INSERT OR IGNORE INTO alert_filters (chat_id) VALUES (?)", (chat_id,))
+            cursor.execute(f"UPDATE alert_filters SET {rule}=? WHERE chat_id=?", (value, chat_id))
+        logger.info(f"Alert filter '{rule}' set to {value!r} for chat_id {chat_id}.")
+    except Error as e:
+        logger.error(f"Error setting alert filter '{rule}' for chat_id {chat_id}: {e}")
+        raise
+
+def clear_alert_filter(chat_id: str) -> None:
+    """Remove all alert filter rules for a chat."""
+    try:
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM alert_filters WHERE chat_id=?", (chat_id,))
+        logger.info(f"Alert filter cleared for chat_id {chat_id}.")
+    except Error as e:
+        logger.error(f"Error clearing alert filter for chat_id {chat_id}: {e}")
+        raise
+
+def get_alert_filter(chat_id: str) -> Dict:
+    """Retrieve a chat's alert filter rules, or None if it has none."""
+    try:
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM alert_filters WHERE chat_id=?", (chat_id,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+    except Error as e:
+        logger.error(f"Error retrieving alert filter for chat_id {chat_id}: {e}")
+        raise
+
+def get_all_alert_filters() -> Dict[str, Dict]:
+    """Retrieve the alert filter rules of every chat that has any, keyed by chat_id."""
+    try:
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM alert_filters")
+            return {row["chat_id"]: dict(row) for row in cursor.fetchall()}
+    except Error as e:
+        logger.error(f"Error retrieving alert filters: {e}")
+        raise
+
 def add_follower_bulk(tracked_account: str, followers_data: List[Dict]) -> None:
     """Add multiple followers at once to improve performance."""
     try:
@@ -159,6 +373,261 @@ def update_follower(tracked_account: str, follower_username: str, follower_data:
     except Error as e:
         logger.error(f"Error updating follower '{follower_username}' for tracked account '{tracked_account}': {e}")
                      
+def get_due_notifications(limit: int = 100) -> List[Dict]:
+    """Retrieve pending outbox notifications whose next attempt is due, oldest first."""
+    try:
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''SELECT * FROM notification_outbox
+                              WHERE status='pending' AND next_attempt_at <= ?
+                              ORDER BY id LIMIT ?''', (time.time(), limit))
+            return [dict(row) for row in cursor.fetchall()]
+    except Error as e:
+        logger.error(f"Error retrieving due notifications: {e}")
+        raise
+
+def get_next_notification_due_at() -> float:
+    """Return the earliest retry time among pending notifications, or None if there are none."""
+    try:
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT MIN(next_attempt_at) FROM notification_outbox WHERE status='pending'")
+            return cursor.fetchone()[0]
+    except Error as e:
+        logger.error(f"Error retrieving next notification due time: {e}")
+        raise
+
+def claim_notification(notification_id: int, lease_seconds: float) -> bool:
+    """Lease a pending notification for delivery so concurrent senders don't send it twice."""
+    try:
+        now = time.time()
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''UPDATE notification_outbox
+                              SET next_attempt_at = ?
+                              WHERE id=? AND status='pending' AND next_attempt_at <= ?''',
+                           (now + lease_seconds, notification_id, now))
+            return cursor.rowcount == 1
+    except Error as e:
+        logger.error(f"Error claiming notification {notification_id}: {e}")
+        raise
+
+def mark_notification_sent(notification_id: int) -> None:
+    """Mark an outbox notification as delivered."""
+    try:
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''UPDATE notification_outbox
+                              SET status='sent', sent_at=CURRENT_TIMESTAMP, last_error=NULL
+                              WHERE id=? AND status != ?''', (notification_id, 'sent'))
+            if cursor.rowcount:
+                cursor.execute("SELECT tracked_account FROM notification_outbox WHERE id=?", (notification_id,))
+                _bump_account_stat(cursor, cursor.fetchone()["tracked_account"], "alerts_sent", 1)
+                cursor.execute('''INSERT INTO daily_alerts (day, alerts_sent) VALUES (date('now'), 1)
+                                  ON CONFLICT(day) DO UPDATE SET alerts_sent = alerts_sent + 1''')
+    except Error as e:
+        logger.error(f"Error marking notification {notification_id} as sent: {e}")
+        raise
+
+def mark_notification_failed(notification_id: int, error: str) -> None:
+    """Give up on a notification that can never be delivered (e.g. rejected by Telegram)."""
+    try:
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''UPDATE notification_outbox SET status='failed', last_error=?
+                              WHERE id=?''', (error, notification_id))
+    except Error as e:
+        logger.error(f"Error marking notification {notification_id} as failed: {e}")
+        raise
+
+def reschedule_notification(notification_id: int, error: str, retry_in: float, count_attempt: bool = True) -> None:
+    """
+    Keep a notification pending after a transient failure and retry it after `retry_in` seconds.
+    Rate-limit waits pass `count_attempt=False` so they don't lengthen the backoff.
+    """
+    try:
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''UPDATE notification_outbox
+                              SET attempts = attempts + ?, next_attempt_at=?, last_error=?
+                              WHERE id=? AND status=?''',
+                           (int(count_attempt), time.time() + retry_in, error, notification_id, 'pending'))
+    except Error as e:
+        logger.error(f"Error rescheduling notification {notification_id}: {e}")
+        raise
+
+def retarget_notifications(chat_id: str, new_chat_id: str) -> int:
+    """Point a chat's pending notifications at the supergroup it migrated to and make them due now."""
+    try:
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''UPDATE notification_outbox SET chat_id=?, next_attempt_at=?
+                              WHERE chat_id=? AND status=?''', (new_chat_id, time.time(), chat_id, 'pending'))
+            return cursor.rowcount
+    except Error as e:
+        logger.error(f"Error retargeting notifications from chat {chat_id} to {new_chat_id}: {e}")
+        raise
+
+def purge_notifications(retention_days: int) -> int:
+    """
+    Delete sent and failed notifications older than `retention_days`. Their idempotency keys only
+    have to outlive the pending window, since followers already in a user DB are never queued again.
+    """
+    try:
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''DELETE FROM notification_outbox
+                              WHERE status != ? AND COALESCE(sent_at, created_at) < datetime('now', ?)''',
+                           ('pending', f"-{int(retention_days)} days"))
+            return cursor.rowcount
+    except Error as e:
+        logger.error(f"Error purging old notifications: {e}")
+        raise
+
+def record_followers_stored(tracked_account: str, count: int, cursor=None) -> None:
+    """
+    Count followers newly ingested into a tracked account's common DB. Pass the cursor of a common
+    DB connection that has the main DB attached as `spyx` to count them in the ingest transaction.
+    """
+    try:
+        if cursor is not None:
+            _bump_account_stat(cursor, tracked_account, "followers_stored", count, schema="spyx")
+            return
+        with create_connection() as conn:
+            _bump_account_stat(conn.cursor(), tracked_account, "followers_stored", count)
+    except Error as e:
+        logger.error(f"Error recording stored followers for tracked account '{tracked_account}': {e}")
+        raise
+
+def set_followers_stored(tracked_account: str, count: int) -> None:
+    """Overwrite the stored-followers counter for an account, e.g. after recounting its common DB."""
+    try:
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT followers_stored FROM account_stats WHERE username=?", (tracked_account,))
+            row = cursor.fetchone()
+            _bump_account_stat(cursor, tracked_account, "followers_stored", count - (row[0] if row else 0))
+    except Error as e:
+        logger.error(f"Error setting stored followers for tracked account '{tracked_account}': {e}")
+        raise
+
+def get_stats(top: int = 10, days: int = 7) -> Dict:
+    """Return the aggregate counters behind /stats without touching any follower DB."""
+    try:
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT name, value FROM stats_totals")
+            totals = {row["name"]: row["value"] for row in cursor.fetchall()}
+            cursor.execute('''SELECT * FROM account_stats WHERE subscribers > 0
+                              ORDER BY subscribers DESC LIMIT ?''', (top,))
+            top_accounts = [dict(row) for row in cursor.fetchall()]
+            cursor.execute("SELECT day, alerts_sent FROM daily_alerts ORDER BY day DESC LIMIT ?", (days,))
+            daily = [dict(row) for row in cursor.fetchall()]
+        return {"totals": totals, "top_accounts": top_accounts, "daily_alerts": daily}
+    except Error as e:
+        logger.error(f"Error retrieving stats: {e}")
+        raise
+
+def get_account_stats(username: str) -> Dict:
+    """Return the counters for a single tracked account, or None if it has none."""
+    try:
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM account_stats WHERE username=?", (username,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+    except Error as e:
+        logger.error(f"Error retrieving stats for account '{username}': {e}")
+        raise
+
+def get_refresh_schedule() -> Dict[str, Dict]:
+    """Return the refresh schedule of every account, keyed by username."""
+    try:
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM refresh_schedule")
+            return {row["username"]: dict(row) for row in cursor.fetchall()}
+    except Error as e:
+        logger.error(f"Error retrieving refresh schedule: {e}")
+        raise
+
+def save_refresh_schedule(username: str, change_rate: float, last_checked_at: float, next_due_at: float) -> None:
+    """Store the learned change rate and next refresh time for an account."""
+    try:
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''INSERT OR REPLACE INTO refresh_schedule (username, change_rate, last_checked_at, next_due_at)
+                              VALUES (?, ?, ?, ?)''', (username, change_rate, last_checked_at, next_due_at))
+    except Error as e:
+        logger.error(f"Error saving refresh schedule for account '{username}': {e}")
+        raise
+
+def index_followers(tracked_account: str, followers: List[Dict], cursor=None) -> None:
+    """
+    Add newly stored followers of a tracked account to the full-text index. Pass the cursor of a
+    common DB connection that has the main DB attached as `spyx` to index them in the ingest transaction.
+    """
+    if not SEARCH_AVAILABLE or not followers:
+        return
+    rows = [(tracked_account, f['name'], f['username'], f['bio'], f['location']) for f in followers]
+    try:
+        if cursor is not None:
+            cursor.executemany('''INSERT INTO spyx.follower_search (tracked_account, name, username, bio, location)
+                                  VALUES (?, ?, ?, ?, ?)''', rows)
+            return
+        with create_connection() as conn:
+            conn.executemany('''INSERT INTO follower_search (tracked_account, name, username, bio, location)
+                                VALUES (?, ?, ?, ?, ?)''', rows)
+    except Error as e:
+        logger.error(f"Error indexing followers for tracked account '{tracked_account}': {e}")
+        raise
+
+def clear_follower_index(tracked_account: str = None) -> None:
+    """Drop indexed followers for one tracked account, or for all of them."""
+    if not SEARCH_AVAILABLE:
+        return
+    try:
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            if tracked_account is None:
+                cursor.execute("DELETE FROM follower_search")
+            else:
+                cursor.execute("DELETE FROM follower_search WHERE tracked_account=?", (tracked_account,))
+    except Error as e:
+        logger.error(f"Error clearing follower index: {e}")
+        raise
+
+def search_followers(chat_id: str, terms: List[str], limit: int = 20) -> List[Dict]:
+    """
+    Full-text search over followers of the accounts a chat tracks. Every term must match
+    (as a prefix) somewhere in the name, username, bio or location; best matches come first.
+    """
+    if not SEARCH_AVAILABLE or not terms:
+        return []
+    try:
+        with create_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT username FROM tracked_accounts WHERE chat_id=?", (chat_id,))
+            accounts = [row["username"] for row in cursor.fetchall()]
+            if not accounts:
+                return []
+            # Scope to the chat's accounts inside the MATCH so only their rows are ranked. Every
+            # value is quoted so user input can't be parsed as FTS5 query syntax.
+            quote = lambda value: '"' + value.replace('"', '""') + '"'
+            query = (f"tracked_account : ({' OR '.join(quote(a) for a in accounts)}) AND "
+                     f"{{name username bio location}} : ({' '.join(quote(t) + '*' for t in terms)})")
+            # The tokenizer splits usernames on '_', so the exact account check stays as a guard;
+            # tracked_account gets no weight in the ranking
+            cursor.execute(f'''SELECT tracked_account, name, username, bio, location FROM follower_search
+                               WHERE follower_search MATCH ?
+                                 AND tracked_account IN ({",".join("?" * len(accounts))})
+                               ORDER BY bm25(follower_search, 0.0, 1.0, 1.0, 1.0, 1.0) LIMIT ?''',
+                           (query, *accounts, limit))
+            return [dict(row) for row in cursor.fetchall()]
+    except Error as e:
+        logger.error(f"Error searching followers for chat_id {chat_id}: {e}")
+        raise
+
 # Initialize tables when the module is loaded
 create_tables()
 
@@ -0,0 +1,112 @@
+import os
+import sqlite3
+import logging
+from collections import OrderedDict
+from logger import logger
+
+# Use the logger from logger.py
+logger = logging.getLogger('KOL_SpyX_Bot')
+
+# Maximum number of follower DB connections kept open at once (each user DB also holds the attached main DB)
+FOLLOWER_DB_CACHE_SIZE = 128
+
+FOLLOWERS_TABLE_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS followers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT,
+    name TEXT,
+    username TEXT,
+    bio TEXT,
+    profile_url TEXT,
+    followers_count INTEGER,
+    created_at TEXT,
+    blue_verified BOOLEAN,
+    location TEXT
+);
+'''
+
+# Directories already known to exist, so repeated lookups skip the filesystem
+_known_dirs = set()
+
+def ensure_dir(path):
+    """Create a directory once per process; later calls for the same path cost nothing."""
+    if path not in _known_dirs:
+        os.makedirs(path, exist_ok=True)
+        _known_dirs.add(path)
+    return path
+
+def forget_dir(path):
+    """Drop a directory from the cache, e.g. after it was removed."""
+    _known_dirs.discard(path)
+
+def create_db_and_table(db_path):
+    with sqlite3.connect(db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute(FOLLOWERS_TABLE_SCHEMA)
+        conn.commit()
+
+class FollowerDBCache:
+    """
+    Bounded LRU of open follower DB connections. The followers table is created when a handle is
+    first opened, so a cached handle is known to have a verified schema and is reused without any
+    further opens or stat calls. Call `evict` (or `evict_dir`) before deleting cached DB files.
+    """
+
+    def __init__(self, max_size=FOLLOWER_DB_CACHE_SIZE):
+        self.max_size = max_size
+        self._connections = OrderedDict()
+        self._attached = set()
+        self.connection_hooks = []  # Callables run on every newly opened connection
+        self.opens = 0
+        self.hits = 0
+
+    def get(self, db_path, attach_main=None):
+        """
+        Return an open connection to `db_path` with the followers table in place. If `attach_main`
+        is a path, that DB is attached as `spyx` so writes to both can share one transaction.
+        """
+        conn = self._connections.get(db_path)
+        if conn is not None:
+            self._connections.move_to_end(db_path)
+            self.hits += 1
+        else:
+            conn = sqlite3.connect(db_path)
+            for hook in self.connection_hooks:
+                hook(conn)
+            conn.execute(FOLLOWERS_TABLE_SCHEMA)
+            conn.commit()
+            self._connections[db_path] = conn
+            self.opens += 1
+            while len(self._connections) > self.max_size:
+                self._close(next(iter(self._connections)))
+
+        if attach_main and db_path not in self._attached:
+            conn.execute("ATTACH DATABASE ? AS spyx", (attach_main,))
+            self._attached.add(db_path)
+        return conn
+
+    def evict(self, db_path):
+        """Close and forget the cached connection for `db_path`, if any."""
+        if db_path in self._connections:
+            self._close(db_path)
+
+    def evict_dir(self, path):
+        """Close and forget every cached connection to a DB inside directory `path`."""
+        prefix = os.path.join(path, "")
+        for db_path in [p for p in self._connections if p.startswith(prefix)]:
+            self._close(db_path)
+
+    def close_all(self):
+        for db_path in list(self._connections):
+            self._close(db_path)
+
+    def _close(self, db_path):
+        conn = self._connections.pop(db_path)
+        self._attached.discard(db_path)
+        try:
+            conn.close()
+        except sqlite3.Error as e:
+            logger.error(f"Error closing follower DB {db_path}: {e}")
+
+# Shared cache for the process
+follower_dbs = FollowerDBCache()
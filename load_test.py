@@ -0,0 +1,345 @@
+"""
+Offline load test for the command handlers and the alert dispatch path.
+
+Starts a local fake Telegram Bot API that records every call and can inject latency, 429
+(RetryAfter) responses and slow responses that trip the client's read timeout (TimedOut). The real
+Application handlers from commands.py and the outbox path from update_script.py are pointed at it
+through TELEGRAM_API_BASE_URL, with all data kept in a temporary directory.
+
+Example:
+    python load_test.py --commands 500 --command-rate 50 --alerts 2000 --alert-rate 200 \\
+        --latency-ms 40 --retry-after-rate 0.02 --timeout-rate 0.01
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+LOAD_TEST_TOKEN = "123456:LOADTEST"
+
+class FakeBotAPI:
+    """Minimal Bot API server recording calls and injecting latency, rate limits and timeouts."""
+
+    def __init__(self, latency_ms=0, jitter_ms=0, retry_after_rate=0.0, retry_after_seconds=1,
+                 timeout_rate=0.0, timeout_delay=2.0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.retry_after_rate = retry_after_rate
+        self.retry_after_seconds = retry_after_seconds
+        self.timeout_rate = timeout_rate
+        self.timeout_delay = timeout_delay
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.sent_messages = []  # (received_at, chat_id, text)
+        self.service_times = []
+        self.injected = {"retry_after": 0, "timed_out": 0}
+        self._message_id = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/bot"
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+
+    def _handler_class(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                started = time.perf_counter()
+                method = self.path.rsplit("/", 1)[-1]
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                params = api._parse_params(self.headers.get("Content-Type", ""), body)
+                status, payload = api.handle(method, params)
+                if payload is None:
+                    return  # Simulated timeout; the client has already given up
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                with api.lock:
+                    api.service_times.append(time.perf_counter() - started)
+
+            do_GET = do_POST
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    @staticmethod
+    def _parse_params(content_type, body):
+        if content_type.startswith("application/json"):
+            return json.loads(body or b"{}")
+        return {key: values[0] for key, values in parse_qs(body.decode()).items()}
+
+    def handle(self, method, params):
+        with self.lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+
+        delay = max(self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms), 0) / 1000
+        if delay:
+            time.sleep(delay)
+
+        if method == "sendMessage":
+            roll = random.random()
+            if roll < self.retry_after_rate:
+                with self.lock:
+                    self.injected["retry_after"] += 1
+                return 429, {"ok": False, "error_code": 429,
+                             "description": f"Too Many Requests: retry after {self.retry_after_seconds}",
+                             "parameters": {"retry_after": self.retry_after_seconds}}
+            if roll < self.retry_after_rate + self.timeout_rate:
+                with self.lock:
+                    self.injected["timed_out"] += 1
+                time.sleep(self.timeout_delay)
+                return 200, None
+
+        return 200, {"ok": True, "result": self._result(method, params)}
+
+    def _result(self, method, params):
+        if method == "getMe":
+            return {"id": int(LOAD_TEST_TOKEN.split(":")[0]), "is_bot": True, "first_name": "SpyX",
+                    "username": "spyx_load_test_bot", "can_join_groups": True,
+                    "can_read_all_group_messages": False, "supports_inline_queries": False}
+        if method in ("sendMessage", "editMessageText"):
+            with self.lock:
+                self._message_id += 1
+                message_id = self._message_id
+                if method == "sendMessage":
+                    self.sent_messages.append((time.time(), params.get("chat_id"), params.get("text", "")))
+            return {"message_id": message_id, "date": int(time.time()), "text": params.get("text", ""),
+                    "chat": {"id": int(params.get("chat_id", 0)), "type": "private"}}
+        if method == "getUpdates":
+            return []
+        return True
+
+def percentiles(samples):
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000
+    return {"count": len(ordered), "mean_ms": round(statistics.mean(ordered) * 1000, 2),
+            "p50_ms": round(pick(0.50), 2), "p95_ms": round(pick(0.95), 2),
+            "p99_ms": round(pick(0.99), 2), "max_ms": round(ordered[-1] * 1000, 2)}
+
+def make_command_update(bot, update_id, chat_id, text):
+    from telegram import Update
+    command = text.split()[0]
+    return Update.de_json({
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id, "date": int(time.time()), "text": text,
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Load"},
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(command)}],
+        },
+    }, bot)
+
+def random_command(chat_id, accounts):
+    kind = random.choices(["add", "add_many", "list", "remove", "help"], weights=[4, 1, 3, 2, 1])[0]
+    if kind == "add":
+        return f"/add @{random.choice(accounts)}"
+    if kind == "add_many":
+        return "/add_many " + " ".join(f"@{a}" for a in random.sample(accounts, min(5, len(accounts))))
+    if kind == "remove":
+        return f"/remove @{random.choice(accounts)}"
+    return f"/{kind}"
+
+async def run_commands(application, args, accounts):
+    """Feed synthetic command updates through the real handlers at the configured rate."""
+    latencies = []
+    errors = []
+
+    async def on_error(update, context):
+        errors.append(type(context.error).__name__)
+
+    application.add_error_handler(on_error)
+
+    async def timed(update):
+        started = time.perf_counter()
+        try:
+            await application.process_update(update)
+        except Exception as e:
+            errors.append(repr(e))
+        latencies.append(time.perf_counter() - started)
+
+    tasks = []
+    started = time.perf_counter()
+    for i in range(args.commands):
+        chat_id = 1000 + random.randrange(args.chats)
+        update = make_command_update(application.bot, i + 1, chat_id, random_command(chat_id, accounts))
+        tasks.append(asyncio.create_task(timed(update)))
+        await asyncio.sleep(1 / args.command_rate)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    return {"commands": args.commands, "elapsed_s": round(elapsed, 2),
+            "commands_per_s": round(args.commands / elapsed, 2),
+            "latency": percentiles(latencies),
+            "handler_errors": {name: errors.count(name) for name in sorted(set(errors))}}
+
+def write_followers_csv(common_data_dir, account, usernames):
+    import pandas as pd
+    created_at = "Mon Jan 01 00:00:00 +0000 2024"
+    pd.DataFrame({
+        "User ID": usernames, "Name": usernames, "Username": usernames,
+        "Bio": ["Load test follower @spyx https://t.co/loadtest"] * len(usernames),
+        "Profile URL": [f"https://twitter.com/{u}" for u in usernames],
+        "Follower Count": [random.randint(0, 50000) for _ in usernames],
+        "Created At": [created_at] * len(usernames),
+        "Blue Verified": [random.random() < 0.3 for _ in usernames],
+        "Location": ["Loadville"] * len(usernames),
+    }).to_csv(os.path.join(common_data_dir, f"{account}.csv"), index=False)
+
+async def run_alerts(update_script, database, fake_api, args, accounts):
+    """Ingest new followers at the configured rate through update_followers and drain the outbox concurrently."""
+    pairs = [(str(1000 + c), a) for c in range(args.chats) for a in accounts[:args.accounts_per_chat]]
+    for chat_id, account in pairs:
+        database.add_account(account, chat_id)
+    watched = sorted({a for _, a in pairs})
+    subscribers = {a: sum(1 for _, b in pairs if b == a) for a in watched}
+
+    # First population is silent; do it before the clock starts
+    for account in watched:
+        write_followers_csv(update_script.common_data_dir, account, [f"{account}_seed"])
+    for account in watched:
+        update_script.ingest_account(account)
+    for chat_id, account in pairs:
+        await update_script.update_followers(chat_id, account)
+
+    enqueued_at = {}
+    producing = True
+
+    async def drainer():
+        while producing or database.get_next_notification_due_at() is not None:
+            await update_script.drain_outbox(max_seconds=args.drain_window)
+            await asyncio.sleep(0.05)
+
+    sent_before = len(fake_api.sent_messages)
+    drain_task = asyncio.create_task(drainer())
+    started = time.perf_counter()
+    produced = 0
+    serial = 0
+    while produced < args.alerts:
+        tick = time.perf_counter()
+        budget = min(args.alert_rate, args.alerts - produced)
+        while budget > 0:
+            account = random.choice(watched)
+            serial += 1
+            username = f"lt_{serial}"
+            write_followers_csv(update_script.common_data_dir, account, [username])
+            enqueued_at[username] = time.time()
+            update_script.ingest_account(account)
+            for chat_id, tracked in pairs:
+                if tracked == account:
+                    await update_script.update_followers(chat_id, account)
+            produced += subscribers[account]
+            budget -= subscribers[account]
+        await asyncio.sleep(max(1 - (time.perf_counter() - tick), 0))
+    producing = False
+    await drain_task
+    elapsed = time.perf_counter() - started
+
+    delivery = []
+    for received_at, _, text in fake_api.sent_messages[sent_before:]:
+        match = re.search(r"@(lt_\d+)<", text)
+        if match and match.group(1) in enqueued_at:
+            delivery.append(received_at - enqueued_at[match.group(1)])
+
+    with database.create_connection() as conn:
+        rows = conn.execute("SELECT status, COUNT(*) AS n, SUM(attempts) AS attempts FROM notification_outbox GROUP BY status").fetchall()
+    outbox = {row["status"]: row["n"] for row in rows}
+    attempts = sum(row["attempts"] or 0 for row in rows)
+    delivered = len(fake_api.sent_messages) - sent_before
+    return {"alerts_enqueued": sum(outbox.values()), "alerts_delivered": delivered,
+            "elapsed_s": round(elapsed, 2), "sends_per_s": round(delivered / elapsed, 2),
+            "delivery_latency": percentiles(delivery), "outbox_status": outbox,
+            "transient_retries": attempts}
+
+async def run(args):
+    workdir = tempfile.mkdtemp(prefix="spyx_load_test_")
+    fake_api = FakeBotAPI(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                          retry_after_rate=args.retry_after_rate, retry_after_seconds=args.retry_after_seconds,
+                          timeout_rate=args.timeout_rate, timeout_delay=args.read_timeout + 0.5)
+    fake_api.start()
+
+    # Point the bot at the fake API and keep all state (main DB, logs, user data) in the work dir
+    os.environ["API_TOKEN"] = LOAD_TEST_TOKEN
+    os.environ["TELEGRAM_API_BASE_URL"] = fake_api.base_url
+    os.environ["TELEGRAM_READ_TIMEOUT"] = str(args.read_timeout)
+    os.environ["USER_DATA_FOLDER"] = os.path.join(workdir, "userdata")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(workdir)
+
+    import KOL_SpyX_BOT
+    import update_script
+    import database
+
+    accounts = [f"kol_{i}" for i in range(args.accounts)]
+    report = {"workdir": workdir}
+    try:
+        if args.commands:
+            application = KOL_SpyX_BOT.build_application()
+            await application.initialize()
+            report["commands"] = await run_commands(application, args, accounts)
+            await application.shutdown()
+        if args.alerts:
+            report["alerts"] = await run_alerts(update_script, database, fake_api, args, accounts)
+    finally:
+        fake_api.stop()
+
+    report["fake_api"] = {"calls": fake_api.calls, "injected": fake_api.injected,
+                          "service_time": percentiles(fake_api.service_times)}
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test SpyX against a local fake Telegram Bot API.")
+    parser.add_argument("--commands", type=int, default=200, help="Number of command updates to send")
+    parser.add_argument("--command-rate", type=float, default=50, help="Command updates per second")
+    parser.add_argument("--alerts", type=int, default=500, help="Approximate number of alerts to generate")
+    parser.add_argument("--alert-rate", type=float, default=100, help="Alerts generated per second")
+    parser.add_argument("--chats", type=int, default=20, help="Number of simulated chats")
+    parser.add_argument("--accounts", type=int, default=30, help="Number of simulated KOL accounts")
+    parser.add_argument("--accounts-per-chat", type=int, default=5, help="Accounts each chat tracks in the alert phase")
+    parser.add_argument("--latency-ms", type=float, default=30, help="Mean fake API latency")
+    parser.add_argument("--jitter-ms", type=float, default=10, help="Uniform jitter around the latency")
+    parser.add_argument("--retry-after-rate", type=float, default=0.0, help="Fraction of sends answered with 429")
+    parser.add_argument("--retry-after-seconds", type=int, default=1, help="retry_after value for injected 429s")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Fraction of sends that exceed the read timeout")
+    parser.add_argument("--read-timeout", type=float, default=1.0, help="Client read timeout in seconds")
+    parser.add_argument("--drain-window", type=float, default=5, help="Seconds each outbox drain waits on retries")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible runs")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    if args.json:
+        args.json = os.path.abspath(args.json)  # The run switches to a temporary work dir
+    if args.seed is not None:
+        random.seed(args.seed)
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.json:
+        with open(args.json, "w") as f:
+            f.write(output)
+
+if __name__ == "__main__":
+    main()
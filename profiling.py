@@ -0,0 +1,133 @@
+import os
+import json
+import time
+import logging
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from logger import logger
+
+# Use the logger from logger.py
+logger = logging.getLogger('KOL_SpyX_Bot')
+
+# Where trace files and cProfile dumps are written
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join(os.path.dirname(__file__), "profiles"))
+
+# Number of slowest accounts listed in the end-of-run summary
+TOP_SLOWEST_ACCOUNTS = 10
+
+def _new_bucket():
+    return {"wall": 0.0, "cpu": 0.0, "calls": 0}
+
+class RunProfiler:
+    """
+    Opt-in profiler for one update run. Records wall and CPU time per stage, overall and per
+    tracked account, plus counters such as rows, DB statements and Bot API calls. When disabled
+    every method is a cheap no-op, so instrumentation can stay in the hot path.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def reset(self):
+        self.started_at = None
+        self.run_wall = self.run_cpu = 0.0
+        self.stages = {}
+        self.counters = {}
+        self.accounts = {}
+        self.current_account = None
+        self._run_started = None
+
+    def enable(self):
+        self.enabled = True
+
+    def start_run(self):
+        if not self.enabled:
+            return
+        self.reset()
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self._run_started = (time.perf_counter(), time.process_time())
+
+    def finish_run(self):
+        if not self.enabled or self._run_started is None:
+            return
+        self.run_wall = time.perf_counter() - self._run_started[0]
+        self.run_cpu = time.process_time() - self._run_started[1]
+
+    def _account(self, account):
+        return self.accounts.setdefault(account, {"stages": {}, "counters": {}})
+
+    def stage(self, name, account=None):
+        """Context manager timing one occurrence of a stage, optionally attributed to an account."""
+        if not self.enabled:
+            return nullcontext()
+        return self._stage(name, account)
+
+    @contextmanager
+    def _stage(self, name, account):
+        previous_account = self.current_account
+        if account is not None:
+            self.current_account = account
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            buckets = [self.stages.setdefault(name, _new_bucket())]
+            if self.current_account is not None:
+                buckets.append(self._account(self.current_account)["stages"].setdefault(name, _new_bucket()))
+            for bucket in buckets:
+                bucket["wall"] += wall
+                bucket["cpu"] += cpu
+                bucket["calls"] += 1
+            self.current_account = previous_account
+
+    def count(self, name, n=1, account=None):
+        """Add to a counter, attributed to `account` or the account of the enclosing stage."""
+        if not self.enabled:
+            return
+        self.counters[name] = self.counters.get(name, 0) + n
+        account = account if account is not None else self.current_account
+        if account is not None:
+            counters = self._account(account)["counters"]
+            counters[name] = counters.get(name, 0) + n
+
+    def trace_connection(self, conn):
+        """Count every SQL statement run on a sqlite3 connection as a DB call."""
+        if self.enabled:
+            conn.set_trace_callback(lambda statement: self.count("db_calls"))
+
+    def slowest_accounts(self, top=TOP_SLOWEST_ACCOUNTS):
+        totals = [(account, sum(bucket["wall"] for bucket in data["stages"].values()))
+                  for account, data in self.accounts.items()]
+        return sorted(totals, key=lambda item: item[1], reverse=True)[:top]
+
+    def report(self):
+        return {
+            "started_at": self.started_at,
+            "wall_seconds": round(self.run_wall, 6),
+            "cpu_seconds": round(self.run_cpu, 6),
+            "stages": self.stages,
+            "counters": self.counters,
+            "accounts": self.accounts,
+            "slowest_accounts": [{"account": a, "wall_seconds": round(w, 6)} for a, w in self.slowest_accounts()],
+        }
+
+    def write_report(self, directory=PROFILE_DIR):
+        """Write the JSON trace for the run, log a short summary, and return the trace path."""
+        if not self.enabled:
+            return None
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"update_run_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+        logger.info(f"Update run took {self.run_wall:.2f}s wall / {self.run_cpu:.2f}s CPU; trace written to {path}")
+        for name, bucket in sorted(self.stages.items(), key=lambda item: item[1]["wall"], reverse=True):
+            logger.info(f"  stage {name}: {bucket['wall']:.3f}s wall, {bucket['cpu']:.3f}s CPU, {bucket['calls']} calls")
+        for account, wall in self.slowest_accounts():
+            logger.info(f"  slow account {account}: {wall:.3f}s {self.accounts[account]['counters']}")
+        return path
+
+# Shared profiler for the process
+profiler = RunProfiler()
@@ -0,0 +1,94 @@
+import math
+import time
+import logging
+from typing import Dict, Iterable, List
+import database
+from logger import logger
+
+# Use the logger from logger.py
+logger = logging.getLogger('KOL_SpyX_Bot')
+
+# Average time between refreshes of an account; adaptive intervals are spread around this
+BASE_REFRESH_INTERVAL = 15 * 60
+MIN_REFRESH_INTERVAL = 60  # Hottest accounts are never refreshed more often than this
+MAX_REFRESH_INTERVAL = 6 * 60 * 60  # Dormant accounts are still checked at least this often
+
+# Weight of the latest refresh in the change-rate moving average
+CHANGE_RATE_ALPHA = 0.3
+
+# Change rates are measured in new followers per hour
+CHANGE_RATE_PERIOD = 60 * 60
+
+# Activity (new followers per hour) credited to accounts that never change, so they back off instead of stopping entirely
+DORMANT_ACTIVITY = 0.1
+
+def account_weight(change_rate: float, subscribers: int) -> float:
+    """How much refreshing an account is worth: busier and more widely tracked accounts weigh more."""
+    return math.sqrt(max(subscribers, 1)) * (change_rate + DORMANT_ACTIVITY)
+
+class RefreshScheduler:
+    """
+    Decides which tracked accounts an update run refreshes and in what order. Each account keeps an
+    exponentially weighted rate of new followers per hour; together with its subscriber count
+    this gives it a weight. Intervals are inversely proportional to weight and normalised by the
+    mean weight, so the total number of refreshes matches refreshing everything every
+    BASE_REFRESH_INTERVAL while hot, widely tracked accounts are checked sooner and more often.
+    """
+
+    def __init__(self, subscriptions: Dict[str, List[str]], now: float = None):
+        self.subscriptions = subscriptions
+        self.now = now if now is not None else time.time()
+        self.schedule = database.get_refresh_schedule()
+        weights = [self.weight(account) for account in subscriptions]
+        self.mean_weight = sum(weights) / len(weights) if weights else 1.0
+
+    def change_rate(self, account: str) -> float:
+        entry = self.schedule.get(account)
+        return entry["change_rate"] if entry else 1.0  # New accounts start out as if active
+
+    def weight(self, account: str) -> float:
+        return account_weight(self.change_rate(account), len(self.subscriptions.get(account, [])))
+
+    def interval(self, account: str) -> float:
+        interval = BASE_REFRESH_INTERVAL * self.mean_weight / self.weight(account)
+        return min(max(interval, MIN_REFRESH_INTERVAL), MAX_REFRESH_INTERVAL)
+
+    def due_accounts(self, pending: Iterable[str] = (), force: bool = False) -> List[str]:
+        """
+        Accounts to refresh now, highest weight first. Accounts that have never been checked or
+        have fresh data waiting in `pending` are always due; `force` makes every account due.
+        """
+        pending = set(pending)
+        due = [account for account in self.subscriptions
+               if force or account in pending or account not in self.schedule
+               or self.schedule[account]["next_due_at"] <= self.now]
+        due.sort(key=self.weight, reverse=True)
+        logger.info(f"{len(due)} of {len(self.subscriptions)} tracked accounts due for refresh.")
+        return due
+
+    def record_refresh(self, account: str, new_followers: int) -> None:
+        """
+        Fold the outcome of a refresh into the account's change rate and schedule its next one. The
+        new followers are divided by the time since the last refresh, so the rate doesn't depend on
+        the interval the scheduler picked; a first refresh assumes BASE_REFRESH_INTERVAL elapsed.
+        """
+        entry = self.schedule.get(account)
+        elapsed = self.now - entry["last_checked_at"] if entry and entry["last_checked_at"] is not None else BASE_REFRESH_INTERVAL
+        # Two CSVs consumed close together shouldn't read as a burst of activity
+        observed_rate = new_followers * CHANGE_RATE_PERIOD / max(elapsed, MIN_REFRESH_INTERVAL)
+        change_rate = (1 - CHANGE_RATE_ALPHA) * self.change_rate(account) + CHANGE_RATE_ALPHA * observed_rate
+        entry = {"username": account, "change_rate": change_rate, "last_checked_at": self.now}
+        self.schedule[account] = entry
+        entry["next_due_at"] = self.now + self.interval(account)
+        database.save_refresh_schedule(account, change_rate, self.now, entry["next_due_at"])
+
+if __name__ == "__main__":
+    # Print the current refresh plan, e.g. for the job that fetches follower CSVs
+    subscriptions = {}
+    with database.create_connection() as conn:
+        for row in conn.execute("SELECT username, chat_id FROM tracked_accounts"):
+            subscriptions.setdefault(row["username"], []).append(row["chat_id"])
+    scheduler = RefreshScheduler(subscriptions)
+    for account in scheduler.due_accounts():
+        print(f"{account}\tsubscribers={len(subscriptions[account])}\tchange_rate={scheduler.change_rate(account):.2f}"
+              f"\tinterval={scheduler.interval(account):.0f}s")
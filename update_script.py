@@ -7,15 +7,23 @@ from datetime import datetime
 import sqlite3
 import telegram 
 from telegram import Bot
+from telegram.request import HTTPXRequest
 import logging
 from dotenv import load_dotenv
 import random
+import json
+import time
 
 load_dotenv()
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import database
 from database import get_tracked_accounts  # Import updated function
+from follower_db import follower_dbs, ensure_dir
+from scheduler import RefreshScheduler
+from alert_filters import compile_alert_filter
+from profiling import profiler, PROFILE_DIR
 from logger import logger
 
 # Use the logger from logger.py
@@ -26,14 +34,24 @@ if not API_TOKEN:
     logger.error("API_TOKEN not set in environment. Exiting.")
     sys.exit(1)
 
-bot = Bot(token=API_TOKEN)
-USER_DATA_FOLDER = os.path.join(os.path.dirname(__file__), "userdata")
+bot = Bot(token=API_TOKEN,
+          base_url=os.getenv('TELEGRAM_API_BASE_URL', 'https://api.telegram.org/bot'),
+          request=HTTPXRequest(read_timeout=float(os.getenv('TELEGRAM_READ_TIMEOUT', 5))))
+USER_DATA_FOLDER = os.getenv('USER_DATA_FOLDER', os.path.join(os.path.dirname(__file__), "userdata"))
 
 # Ensure the common data directory exists
 common_data_dir = os.path.join(USER_DATA_FOLDER, "common_data")
 if not os.path.exists(common_data_dir):
     os.makedirs(common_data_dir)
 
+# Outbox delivery settings
+OUTBOX_BATCH_SIZE = 100  # Notifications fetched per outbox query
+OUTBOX_LEASE_SECONDS = 60  # How long a claimed notification is hidden from other senders
+OUTBOX_RETRY_DELAY = 5  # Seconds before the first retry of a failed send, doubled on each further failure
+OUTBOX_MAX_RETRY_DELAY = 600  # Upper bound for the retry backoff; sends hit by network errors are retried until delivered
+OUTBOX_DRAIN_SECONDS = 60  # How long a run keeps waiting on retries before leaving them for the next run
+OUTBOX_RETENTION_DAYS = 7  # Sent and failed notifications are deleted after this many days
+
 # The required columns for the CSV files
 required_columns = {
     "User ID": "user_id",
@@ -53,41 +71,26 @@ def get_common_follower_db(tracked_account):
 
 # Utility function to get user-specific database path
 def get_user_follower_db(chat_id, tracked_account):
-    user_db_dir = os.path.join(USER_DATA_FOLDER, str(chat_id))
-    if not os.path.exists(user_db_dir):
-        os.makedirs(user_db_dir)
+    user_db_dir = ensure_dir(os.path.join(USER_DATA_FOLDER, str(chat_id)))
     return os.path.join(user_db_dir, f"{tracked_account}.db")
 
-def create_db_and_table(db_path):
-    with sqlite3.connect(db_path) as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS followers (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id TEXT,
-            name TEXT,
-            username TEXT,
-            bio TEXT,
-            profile_url TEXT,
-            followers_count INTEGER,
-            created_at TEXT,
-            blue_verified BOOLEAN,
-            location TEXT
-        );
-        ''')
-        conn.commit()
-
 def check_table_exists(db_path):
     with sqlite3.connect(db_path) as conn:
         cursor = conn.cursor()
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='followers';")
         return cursor.fetchone() is not None
 
+# Utility function to get the path of a tracked account's pending follower CSV
+def get_follower_csv(tracked_account):
+    return os.path.join(common_data_dir, f"{tracked_account}.csv")
+
 def fetch_new_followers(tracked_account):
     """
     Fetch new followers from the uploaded CSV file and ensure it matches the required columns.
+    The CSV is left in place; the caller deletes it once its rows are committed. Returns None
+    when there is no readable CSV.
     """
-    csv_path = os.path.join(common_data_dir, f"{tracked_account}.csv")
+    csv_path = get_follower_csv(tracked_account)
     if os.path.exists(csv_path):
         try:
             followers_df = pd.read_csv(csv_path)
@@ -95,20 +98,24 @@ def fetch_new_followers(tracked_account):
                                (0 if sql_col in ["blue_verified", "followers_count"] else 
                                 (datetime.now().strftime('%Y-%m-%d %H:%M:%S') if sql_col == "created_at" else None))
                                for csv_col, sql_col in required_columns.items()}
-            normalized_df = pd.DataFrame(normalized_data)
-            os.remove(csv_path)
-            logger.info(f"CSV for {tracked_account} processed and deleted.")
-            return normalized_df
+            return pd.DataFrame(normalized_data)
         except Exception as e:
             logger.error(f"Error processing CSV for {tracked_account}: {e}")
     else:
         logger.warning(f"No CSV found for {tracked_account}.")
-    return pd.DataFrame(columns=required_columns.values())
-def insert_followers_to_db(db_path: str, followers: pd.DataFrame) -> None:
+    return None
+
+def insert_followers_to_db(db_path: str, followers: pd.DataFrame, tracked_account: str) -> list:
+    """
+    Insert followers not yet in the DB and return the ones that were added. The main DB is attached
+    so the stored-followers counter and search index commit with the rows; on error nothing is
+    stored and it raises.
+    """
+    inserted = []
     try:
         if not followers.empty:
             followers = followers[list(required_columns.values())]
-            with sqlite3.connect(db_path) as conn:
+            with follower_dbs.get(db_path, attach_main=database.DATABASE_FILE) as conn:
                 cursor = conn.cursor()
                 for _, follower in followers.iterrows():
                     # Check for duplicates in common DB
@@ -119,17 +126,22 @@ def insert_followers_to_db(db_path: str, followers: pd.DataFrame) -> None:
                                            followers_count, created_at, blue_verified, location)
                                           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''', 
                                           tuple(follower))
+                        inserted.append(follower.to_dict())
                         logger.info(f"Inserted new follower {follower['username']} into {db_path}")
                     else:
                         logger.info(f"Skipped duplicate follower {follower['username']} in {db_path}")
-                conn.commit()
+                database.record_followers_stored(tracked_account, len(inserted), cursor)
+                with profiler.stage("search_index", tracked_account):
+                    database.index_followers(tracked_account, inserted, cursor)
             logger.info(f"{len(followers)} followers processed for {db_path}")
         else:
             logger.info(f"No followers to insert into {db_path}")
     except sqlite3.Error as e:
         logger.error(f"Error inserting followers into {db_path}: {e}")
+        raise
+    return inserted
         
-async def send_follower_notification(chat_id, follower_details):
+def render_follower_notification(follower_details):
     created_at_date = datetime.strptime(follower_details['created_at'], "%a %b %d %H:%M:%S %z %Y")
     days_ago = (datetime.now(created_at_date.tzinfo) - created_at_date).days
 
@@ -140,7 +152,7 @@ async def send_follower_notification(chat_id, follower_details):
         for url in re.findall(r'(https?://(?:t\.co|t\.me)/[^\s]+)', bio):
             bio = bio.replace(url, f'<a href="{url}">🔗Links</a>')
 
-    message = (
+    return (
         f"🚨 NEW FOLLOWING ALERT : \n\n"
         f"<a href='{follower_details['profile_url']}'>@{follower_details['username']}</a> "
         f"← is followed by "
@@ -153,82 +165,184 @@ async def send_follower_notification(chat_id, follower_details):
         f"•✅ Verified: {follower_details['blue_verified']}"
     )
 
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
+def enqueue_follower_notification(user_cursor, chat_id, follower_details):
+    """
+    Queue an alert in the outbox through the user DB connection (which has the main DB attached as
+    `spyx`), so it commits atomically with the follower row that marks the follower as seen.
+    """
+    idempotency_key = f"{chat_id}:{follower_details['tracked_account']}:{follower_details['username']}"
+    user_cursor.execute('''INSERT OR IGNORE INTO spyx.notification_outbox
+                           (idempotency_key, chat_id, tracked_account, payload)
+                           VALUES (?, ?, ?, ?)''',
+                        (idempotency_key, str(chat_id), follower_details['tracked_account'],
+                         json.dumps(follower_details, default=str)))
+
+async def send_follower_notification(notification):
+    """Deliver one claimed outbox notification and record the outcome."""
+    notification_id = notification['id']
+    chat_id = notification['chat_id']
+    account = notification['tracked_account']
+    try:
+        with profiler.stage("render", account):
+            message = render_follower_notification(json.loads(notification['payload']))
+    except Exception as e:
+        logger.error(f"Could not render notification {notification_id} for chat {chat_id}, giving up: {e}")
+        database.mark_notification_failed(notification_id, str(e))
+        return
+
+    try:
+        profiler.count("api_calls", 1, account)
+        with profiler.stage("telegram", account):
             await bot.send_message(chat_id=chat_id, text=message, parse_mode='HTML')
-            break
-        except telegram.error.TimedOut:
-            await asyncio.sleep(5 * (attempt + 1))  # Exponential backoff
-            if attempt == max_retries - 1:
-                logger.error(f"Failed to send notification to chat {chat_id} after {max_retries} attempts")
-        except Exception as e:
-            logger.error(f"An error occurred while sending notification to chat {chat_id}: {e}")
-            break
+    except telegram.error.RetryAfter as e:
+        # Waiting out a rate limit is not a failed attempt
+        logger.warning(f"Rate limited sending notification to chat {chat_id}, retrying in {e.retry_after}s")
+        database.reschedule_notification(notification_id, str(e), e.retry_after, count_attempt=False)
+    except telegram.error.ChatMigrated as e:
+        # The group became a supergroup; send this and the chat's other pending alerts there instead
+        moved = database.retarget_notifications(chat_id, str(e.new_chat_id))
+        # Release this claim right away; it may have been retargeted by an earlier notification in the batch
+        database.reschedule_notification(notification_id, str(e), 0, count_attempt=False)
+        logger.warning(f"Chat {chat_id} migrated to {e.new_chat_id}; retargeted {moved} pending notifications.")
+    except (telegram.error.BadRequest, telegram.error.Forbidden) as e:
+        logger.error(f"Notification to chat {chat_id} rejected, giving up: {e}")
+        database.mark_notification_failed(notification_id, str(e))
+    except telegram.error.NetworkError as e:
+        # Timeouts and connection errors are transient: keep it pending and back off
+        retry_in = outbox_backoff(notification['attempts'] + 1)
+        logger.warning(f"Error sending notification to chat {chat_id}, retrying in {retry_in:.1f}s: {e}")
+        database.reschedule_notification(notification_id, str(e), retry_in)
+    except Exception as e:
+        # Anything else (e.g. InvalidToken) won't go away by retrying
+        logger.error(f"Error sending notification to chat {chat_id}, giving up: {e}")
+        database.mark_notification_failed(notification_id, str(e))
+    else:
+        database.mark_notification_sent(notification_id)
+        profiler.count("alerts_sent", 1, account)
 
-async def update_followers(chat_id, tracked_account):
-    common_db = get_common_follower_db(tracked_account)
-    user_db = get_user_follower_db(chat_id, tracked_account)
+def outbox_backoff(attempt):
+    """Capped exponential backoff with jitter for the given (1-based) failed attempt."""
+    delay = min(OUTBOX_RETRY_DELAY * 2 ** (attempt - 1), OUTBOX_MAX_RETRY_DELAY)
+    return delay + random.uniform(0, 1)
+
+async def drain_outbox(max_seconds=OUTBOX_DRAIN_SECONDS):
+    """
+    Send every due outbox notification. Retries that become due within `max_seconds` are waited
+    for; anything still pending after that is picked up by the next run.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_seconds
+    while True:
+        due = database.get_due_notifications(OUTBOX_BATCH_SIZE)
+        for notification in due:
+            if database.claim_notification(notification['id'], OUTBOX_LEASE_SECONDS):
+                await send_follower_notification(notification)
+        if due:
+            continue
 
-    if not check_table_exists(common_db):
-        logger.info(f"Creating table in {common_db}...")
-        create_db_and_table(common_db)
+        next_due_at = database.get_next_notification_due_at()
+        if next_due_at is None:
+            break
+        wait = max(next_due_at - time.time(), 0)
+        if loop.time() + wait > deadline:
+            logger.info("Outbox retries pending beyond this run's drain window; leaving them for the next run.")
+            break
+        await asyncio.sleep(wait)
 
-    if not check_table_exists(user_db):
-        logger.info(f"Creating table in {user_db}...")
-        create_db_and_table(user_db)
+    purged = database.purge_notifications(OUTBOX_RETENTION_DAYS)
+    if purged:
+        logger.info(f"Purged {purged} delivered or failed notifications older than {OUTBOX_RETENTION_DAYS} days.")
 
+def ingest_account(tracked_account):
+    """
+    Load a tracked account's pending CSV into its common DB and return how many followers were new,
+    or None if no CSV was consumed. The CSV is only deleted once its rows are committed, so a failed
+    ingest is retried on the next run.
+    """
     try:
-        new_data = fetch_new_followers(tracked_account)
+        with profiler.stage("csv_parse", tracked_account):
+            new_data = fetch_new_followers(tracked_account)
+        if new_data is None:
+            return None
+        profiler.count("csv_rows", len(new_data), tracked_account)
+        inserted = []
         if not new_data.empty:
-            insert_followers_to_db(common_db, new_data)
+            with profiler.stage("sqlite_ingest", tracked_account):
+                inserted = insert_followers_to_db(get_common_follower_db(tracked_account), new_data, tracked_account)
+            profiler.count("rows_ingested", len(inserted), tracked_account)
+        os.remove(get_follower_csv(tracked_account))
+        logger.info(f"CSV for {tracked_account} processed and deleted.")
+        return len(inserted)
+    except Exception as e:
+        logger.error(f"Unexpected error ingesting followers for account {tracked_account}: {e}")
+        return None
 
-        with sqlite3.connect(common_db) as common_conn, sqlite3.connect(user_db) as user_conn:
+async def update_followers(chat_id, tracked_account, alert_filter=None):
+    common_db = get_common_follower_db(tracked_account)
+    user_db = get_user_follower_db(chat_id, tracked_account)
+
+    try:
+        # Cached handles; the user DB has the main DB attached so new follower rows and their outbox alerts commit together
+        common_conn = follower_dbs.get(common_db)
+        user_conn = follower_dbs.get(user_db, attach_main=database.DATABASE_FILE)
+        with common_conn, user_conn:
             common_cursor = common_conn.cursor()
             user_cursor = user_conn.cursor()
 
-            common_cursor.execute("SELECT username FROM followers")
-            common_usernames = set(row[0] for row in common_cursor.fetchall())
+            with profiler.stage("sqlite_read", tracked_account):
+                common_cursor.execute("SELECT username FROM followers")
+                common_usernames = set(row[0] for row in common_cursor.fetchall())
 
-            user_cursor.execute("SELECT username FROM followers")
-            user_usernames = set(row[0] for row in user_cursor.fetchall())
+                user_cursor.execute("SELECT username FROM followers")
+                user_usernames = set(row[0] for row in user_cursor.fetchall())
 
             if not user_usernames:
                 logger.info(f"First population of user {chat_id}'s database for account {tracked_account}. No notifications will be sent.")
-                for username in common_usernames:
-                    common_cursor.execute("SELECT * FROM followers WHERE username = ?", (username,))
-                    follower = common_cursor.fetchone()
-                    if follower:
-                        user_cursor.execute('''INSERT INTO followers 
-                            (user_id, name, username, bio, profile_url, followers_count, created_at, blue_verified, location) 
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''', 
-                            follower[1:])  # Excluding the ID column
-                user_conn.commit()
+                with profiler.stage("sqlite_write", tracked_account):
+                    for username in common_usernames:
+                        common_cursor.execute("SELECT * FROM followers WHERE username = ?", (username,))
+                        follower = common_cursor.fetchone()
+                        if follower:
+                            user_cursor.execute('''INSERT INTO followers 
+                                (user_id, name, username, bio, profile_url, followers_count, created_at, blue_verified, location) 
+                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''', 
+                                follower[1:])  # Excluding the ID column
+                    user_conn.commit()
                 logger.info(f"User {chat_id}'s database for {tracked_account} has been populated.")
                 return  # Skip further processing for initial population
 
             # Find new followers
-            new_followers = common_usernames - user_usernames
+            with profiler.stage("set_diff", tracked_account):
+                new_followers = common_usernames - user_usernames
             logger.info(f"New followers found for account {tracked_account} for user {chat_id}: {new_followers}")
 
             if new_followers:
-                for username in new_followers:
-                    common_cursor.execute("SELECT * FROM followers WHERE username = ?", (username,))
-                    follower = common_cursor.fetchone()
-                    if follower:
-                        user_cursor.execute("SELECT 1 FROM followers WHERE username = ?", (username,))
-                        if not user_cursor.fetchone():  # Check if this follower exists in the user's DB
-                            user_cursor.execute('''INSERT INTO followers 
-                                (user_id, name, username, bio, profile_url, followers_count, created_at, blue_verified, location) 
-                                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''', 
-                                follower[1:])  # Excluding the ID column
-                            # Prepare the dictionary for notification, excluding tracked_account since it's not in the schema
-                            follower_details = dict(zip(required_columns.values(), follower[1:]))
-                            follower_details['tracked_account'] = tracked_account  # Add for notification purposes only
-                            await send_follower_notification(chat_id, follower_details)
-                        else:
-                            logger.info(f"Follower {username} already exists in user {chat_id}'s database for {tracked_account}. Skipping.")
-                user_conn.commit()
+                with profiler.stage("sqlite_write", tracked_account):
+                    rows = []
+                    for username in new_followers:
+                        common_cursor.execute("SELECT * FROM followers WHERE username = ?", (username,))
+                        follower = common_cursor.fetchone()
+                        if follower:
+                            rows.append(follower[1:])  # Excluding the ID column
+                    user_cursor.executemany('''INSERT INTO followers 
+                        (user_id, name, username, bio, profile_url, followers_count, created_at, blue_verified, location) 
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''', rows)
+                profiler.count("new_followers", len(rows), tracked_account)
+
+                # Every new follower is marked as seen, but only those passing the chat's filter are queued for an alert
+                if alert_filter is not None and rows:
+                    with profiler.stage("filter", tracked_account):
+                        mask = alert_filter(pd.DataFrame(rows, columns=list(required_columns.values())))
+                        rows = [row for row, keep in zip(rows, mask) if keep]
+                    logger.info(f"{len(rows)} of {len(mask)} new followers of {tracked_account} pass user {chat_id}'s alert filter.")
+                with profiler.stage("sqlite_write", tracked_account):
+                    for row in rows:
+                        # Prepare the dictionary for notification, excluding tracked_account since it's not in the schema
+                        follower_details = dict(zip(required_columns.values(), row))
+                        follower_details['tracked_account'] = tracked_account  # Add for notification purposes only
+                        enqueue_follower_notification(user_cursor, chat_id, follower_details)
+                    user_conn.commit()
+                profiler.count("alerts_queued", len(rows), tracked_account)
                 logger.info(f"Updated followers for account {tracked_account} for user {chat_id}.")
             else:
                 logger.info(f"No new followers for account {tracked_account} for user {chat_id}.")
@@ -238,17 +352,31 @@ async def update_followers(chat_id, tracked_account):
     except Exception as e:
         logger.error(f"Unexpected error updating followers for account {tracked_account} for user {chat_id}: {e}")
 
-async def process_all_users():
-    tasks = []
+async def process_all_users(refresh_all=False):
+    profiler.start_run()
+    subscriptions = {}  # tracked account -> chat IDs tracking it
     for chat_id in [chat_id for chat_id in os.listdir(USER_DATA_FOLDER) if os.path.isdir(os.path.join(USER_DATA_FOLDER, chat_id))]:
         try:
-            tracked_accounts = get_tracked_accounts(chat_id)
-            if tracked_accounts:
-                for account in tracked_accounts:
-                    tasks.append(update_followers(chat_id, account))
+            for account in get_tracked_accounts(chat_id):
+                subscriptions.setdefault(account, []).append(chat_id)
         except Exception as e:
             logger.error(f"Error processing user {chat_id}: {e}")
 
+    # Refresh only the accounts that are due, busiest and most widely tracked first
+    scheduler = RefreshScheduler(subscriptions)
+    pending = [f[:-len(".csv")] for f in os.listdir(common_data_dir) if f.endswith(".csv")]
+    # Compile each chat's alert filter once per run
+    alert_filters = {chat_id: compile_alert_filter(rules) for chat_id, rules in database.get_all_alert_filters().items()}
+
+    tasks = []
+    for account in scheduler.due_accounts(pending=pending, force=refresh_all):
+        inserted = ingest_account(account)
+        # Only a consumed CSV says how much the account changed; without one there is nothing to learn from
+        if inserted is not None:
+            scheduler.record_refresh(account, inserted)
+        for chat_id in subscriptions[account]:
+            tasks.append(update_followers(chat_id, account, alert_filters.get(chat_id)))
+
     if tasks:
         # Use asyncio.gather with a timeout to manage long-running tasks
         try:
@@ -258,9 +386,66 @@ async def process_all_users():
     else:
         logger.info("No users or tracked accounts found to process.")
 
+    # Alerts are committed to the outbox above; deliver them (and any left over from earlier runs)
+    await drain_outbox()
+
+    profiler.finish_run()
+    profiler.write_report()
+
+def rebuild_follower_stats():
+    """Recount every common follower DB into the /stats counters, e.g. after upgrading an existing install."""
+    for file_name in os.listdir(common_data_dir):
+        if not file_name.endswith(".db"):
+            continue
+        tracked_account = file_name[:-len(".db")]
+        common_db = get_common_follower_db(tracked_account)
+        if check_table_exists(common_db):
+            with sqlite3.connect(common_db) as conn:
+                count = conn.execute("SELECT COUNT(*) FROM followers").fetchone()[0]
+            database.set_followers_stored(tracked_account, count)
+    logger.info("Follower stats rebuilt from common data.")
+
+def rebuild_search_index():
+    """Re-index every common follower DB for /search, e.g. after upgrading an existing install."""
+    database.clear_follower_index()
+    for file_name in os.listdir(common_data_dir):
+        if not file_name.endswith(".db"):
+            continue
+        tracked_account = file_name[:-len(".db")]
+        common_db = get_common_follower_db(tracked_account)
+        if check_table_exists(common_db):
+            with sqlite3.connect(common_db) as conn:
+                conn.row_factory = sqlite3.Row
+                followers = [dict(row) for row in conn.execute("SELECT name, username, bio, location FROM followers")]
+            database.index_followers(tracked_account, followers)
+    logger.info("Follower search index rebuilt from common data.")
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
+    # Opt-in profiling: --profile writes a per-run trace, --cprofile also dumps cProfile stats
+    profiling = "--profile" in sys.argv or "--cprofile" in sys.argv or os.getenv('SPYX_PROFILE') == '1'
+    cprofiler = None
+    if profiling:
+        profiler.enable()
+        database.connection_hooks.append(profiler.trace_connection)
+        follower_dbs.connection_hooks.append(profiler.trace_connection)
+    if "--cprofile" in sys.argv:
+        import cProfile
+        cprofiler = cProfile.Profile()
+        cprofiler.enable()
     try:
-        asyncio.run(process_all_users())
+        if "--rebuild-stats" in sys.argv:
+            rebuild_follower_stats()
+        if "--rebuild-search" in sys.argv:
+            rebuild_search_index()
+        asyncio.run(process_all_users(refresh_all="--all" in sys.argv))
     except Exception as e:
         logger.error(f"An error occurred during the execution of the script: {e}")
+    finally:
+        follower_dbs.close_all()
+        if cprofiler is not None:
+            cprofiler.disable()
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            cprofile_path = os.path.join(PROFILE_DIR, f"update_run_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof")
+            cprofiler.dump_stats(cprofile_path)
+            logger.info(f"cProfile stats written to {cprofile_path}")